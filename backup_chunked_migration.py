@@ -405,7 +405,19 @@ class ChunkedBackupMigration:
             raise
     
     def process_files_batch(self, records: List[Dict], account_context: str = ""):
-        """Process a batch of file records."""
+        """Process a batch of file records.
+        
+        File records are collected while files transfer and written in short
+        transactions, so no write lock is held across network I/O.
+        """
+        pending_rows = []
+        try:
+            self._process_records(records, account_context, pending_rows)
+        finally:
+            self._record_batch(pending_rows)
+    
+    def _process_records(self, records: List[Dict], account_context: str, pending_rows: List[Dict]):
+        """Transfer each record's file, queueing its file record in ``pending_rows``."""
         for i, record in enumerate(records, 1):
             try:
                 context = f"{account_context} - " if account_context else ""
@@ -418,7 +430,7 @@ class ChunkedBackupMigration:
                 else:
                     self.logger.info(f"📄 {context}Processing file {i}/{len(records)}: {file_name} [no extension]")
                 
-                success = self.process_single_file(record)
+                success = self.process_single_file(record, pending_rows)
                 if success:
                     self.stats['successful'] += 1
                 else:
@@ -431,13 +443,28 @@ class ChunkedBackupMigration:
                     success_rate = (self.stats['successful'] / self.stats['processed']) * 100
                     self.logger.info(f"📊 Progress: {self.stats['processed']} processed, {success_rate:.1f}% success rate")
                 
+                # Write file records in groups rather than per file
+                if len(pending_rows) >= 1000:
+                    self._record_batch(pending_rows)
+                
             except Exception as e:
                 self.logger.error(f"❌ Error processing record {record['Id']}: {e}")
                 self.stats['failed'] += 1
                 continue
     
-    def process_single_file(self, record: Dict) -> bool:
-        """Process a single DocListEntry record for backup."""
+    def _record_batch(self, pending_rows: List[Dict]):
+        """Write queued file records in one short transaction and empty the queue."""
+        if pending_rows:
+            with self.db.transaction():
+                new_files = self.db.record_file_migrations(pending_rows)
+            self.stats['new_files'] += new_files
+            self.stats['updated_files'] += len(pending_rows) - new_files
+            pending_rows.clear()
+        # Commits a transaction opened earlier by a buffered-error write, if the block above joined it
+        self.db.flush()
+    
+    def process_single_file(self, record: Dict, pending_rows: List[Dict]) -> bool:
+        """Process a single DocListEntry record for backup, queueing its file record in ``pending_rows``."""
         doclist_id = record['Id']
         
         try:
@@ -482,7 +509,7 @@ class ChunkedBackupMigration:
             content, file_size = self.download_file(original_url, doclist_id, identifier_c)
             
             # Calculate file hash for change detection
-            file_hash = calculate_file_hash(content)
+            file_hash = calculate_file_hash(content, MIGRATION_CONFIG.get("hash_algorithm", "sha256"))
             
             # Upload to your S3
             your_s3_url = self.upload_to_s3(content, s3_key, file_name)
@@ -502,11 +529,7 @@ class ChunkedBackupMigration:
                 'last_modified_sf': record.get('LastModifiedDate')
             }
             
-            is_new = self.db.record_file_migration(file_data)
-            if is_new:
-                self.stats['new_files'] += 1
-            else:
-                self.stats['updated_files'] += 1
+            pending_rows.append(file_data)
             
             self.stats['total_size'] += file_size
             
@@ -1014,6 +1037,7 @@ class ChunkedBackupMigration:
             # Update final run stats
             self.db.update_run_stats(self.run_id, **self.stats)
             self.db.end_migration_run(self.run_id, 'completed')
+            self.db.analyze()
             
         except Exception as e:
             error_msg = f"Migration failed: {str(e)}"
@@ -271,8 +271,12 @@ class BackupOnlyMigration:
             self.logger.error(f"Unexpected error uploading to S3: {e}")
             raise
     
-    def process_single_file(self, record: Dict) -> bool:
-        """Process a single DocListEntry record for backup."""
+    def process_single_file(self, record: Dict, pending_rows: List[Dict]) -> bool:
+        """Process a single DocListEntry record for backup.
+        
+        The file's database record is appended to ``pending_rows`` rather
+        than written, so no write lock is held during the batch's transfers.
+        """
         doclist_id = record['Id']
         
         try:
@@ -310,7 +314,7 @@ class BackupOnlyMigration:
             content, file_size = self.download_file(original_url)
             
             # Calculate file hash for change detection
-            file_hash = calculate_file_hash(content)
+            file_hash = calculate_file_hash(content, MIGRATION_CONFIG.get("hash_algorithm", "sha256"))
             
             # Upload to your S3
             your_s3_url = self.upload_to_s3(content, s3_key, file_name)
@@ -330,11 +334,7 @@ class BackupOnlyMigration:
                 'last_modified_sf': record.get('LastModifiedDate')
             }
             
-            is_new = self.db.record_file_migration(file_data)
-            if is_new:
-                self.stats['new_files'] += 1
-            else:
-                self.stats['updated_files'] += 1
+            pending_rows.append(file_data)
             
             self.stats['successful'] += 1
             self.stats['total_size'] += file_size
@@ -355,6 +355,16 @@ class BackupOnlyMigration:
             self.stats['failed'] += 1
             return False
     
+    def _record_batch(self, pending_rows: List[Dict]):
+        """Write a batch's file records and run stats in one short transaction."""
+        with self.db.transaction():
+            new_files = sum(1 for file_data in pending_rows if self.db.record_file_migration(file_data))
+            self.stats['new_files'] += new_files
+            self.stats['updated_files'] += len(pending_rows) - new_files
+            self.db.update_run_stats(self.run_id, **self.stats)
+        # Commits a transaction opened earlier by a buffered-error write, if the block above joined it
+        self.db.flush()
+    
     def _file_exists_in_s3(self, s3_key: str) -> bool:
         """Check if file already exists in S3."""
         try:
@@ -433,13 +443,15 @@ class BackupOnlyMigration:
                 
                 self.logger.info(f"Processing batch {batch_num + 1}/{total_batches} ({len(batch)} files)")
                 
-                for record in batch:
-                    self.stats['processed'] += 1
-                    self.process_single_file(record)
-                    
-                    # Update run stats periodically
-                    if self.stats['processed'] % 50 == 0:
-                        self.db.update_run_stats(self.run_id, **self.stats)
+                # Transfers first; the batch's rows are then written in one
+                # short transaction (also if the batch is interrupted)
+                pending_rows = []
+                try:
+                    for record in batch:
+                        self.stats['processed'] += 1
+                        self.process_single_file(record, pending_rows)
+                finally:
+                    self._record_batch(pending_rows)
                 
                 # Progress update
                 progress = (batch_num + 1) / total_batches * 100
@@ -451,6 +463,7 @@ class BackupOnlyMigration:
             # Update final run stats
             self.db.update_run_stats(self.run_id, **self.stats)
             self.db.end_migration_run(self.run_id, 'completed')
+            self.db.analyze()
             
         except Exception as e:
             error_msg = f"Migration failed: {str(e)}"
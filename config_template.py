@@ -42,6 +42,13 @@ MIGRATION_CONFIG = {
         '.jpg', '.jpeg', '.png', '.gif', '.txt', '.csv', '.snote'
     ],
     "dry_run": True,  # Set to True to test without actual file operations
+    "max_concurrent_files": 16,  # Files migrated in parallel by salesforce_s3_migration.py
+    "use_bulk_api_for_updates": False,  # salesforce_s3_migration.py full runs: apply URL updates as Bulk API 2.0 jobs (one per 10,000 files)
+    "max_concurrent_api_requests": 5,  # Parallel Salesforce API calls (rollback updates); stay under the org's concurrency limit
+    "api_requests_per_second": 10,  # Token-bucket rate limit for Salesforce update calls
+    "session_cache_ttl_seconds": 3600,  # Reuse a cached Salesforce session for this long (0 disables the cache)
+    "rollback_compression": "gzip",  # Rollback manifest format: "none", "gzip" (.json.gz) or "zstd" (.json.zst, needs `pip install zstandard`)
+    "hash_algorithm": "sha256",  # "sha256" (compliance default) or "blake3" (faster, needs `pip install blake3`)
     
     # PROOF OF CONCEPT SETTINGS
     "test_single_account": True,  # Set to True to test with just one account
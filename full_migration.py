@@ -37,6 +37,19 @@ from simple_salesforce import Salesforce
 from simple_salesforce.exceptions import SalesforceError
 from urllib.parse import urlparse
 import json
+import gzip
+
+try:
+    # Optional: zstd-compressed rollback manifests
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    # Optional: C-level JSON encoder for large rollback manifests
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import our database manager
 from migration_db import MigrationDB, calculate_file_hash
@@ -234,67 +247,88 @@ class FullMigration:
         try:
             self.logger.info(f"Copying {len(new_files)} new files to S3...")
             
-            for i, record in enumerate(new_files, 1):
-                try:
-                    doclist_id = record['Id']
-                    original_url = record['Document__c']
-                    account_id = record['Account__c']
-                    account_name = record['Account__r']['Name'] if record['Account__r'] else 'Unknown'
-                    
-                    # Clean account name for file path
-                    clean_account_name = self._clean_filename(account_name)
-                    
-                    # Extract file name from URL
-                    parsed_url = urlparse(original_url)
-                    file_name = os.path.basename(parsed_url.path) or f"file_{doclist_id}"
-                    
-                    # Generate S3 key
-                    s3_key = f"uploads/{account_id}/{clean_account_name}/{file_name}"
-                    
-                    self.logger.info(f"Copying new file ({i}/{len(new_files)}): {file_name}")
-                    
-                    if not self.dry_run:
-                        # Download from external S3
-                        content, file_size = self._download_file(original_url)
-                        
-                        # Upload to your S3
-                        your_s3_url = self._upload_to_s3(content, s3_key, file_name)
-                        
-                        # Calculate file hash
-                        file_hash = calculate_file_hash(content)
-                        
-                        # Record in database
-                        file_data = {
-                            'doclist_entry_id': doclist_id,
-                            'account_id': account_id,
-                            'account_name': account_name,
-                            'original_url': original_url,
-                            'your_s3_key': s3_key,
-                            'your_s3_url': your_s3_url,
-                            'file_name': file_name,
-                            'file_size_bytes': file_size,
-                            'file_hash': file_hash,
-                            'backup_timestamp': datetime.now().isoformat(),
-                            'last_modified_sf': record.get('LastModifiedDate')
-                        }
-                        
-                        self.db.record_file_migration(file_data)
-                        self.stats['total_size'] += file_size
-                    else:
-                        self.logger.info(f"  [DRY RUN] Would copy: {file_name} to {s3_key}")
-                    
-                    self.stats['new_files'] += 1
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to copy new file {record['Id']}: {e}")
-                    continue
-            
+            # File records are written in short transactions, never across a transfer
+            pending_rows = []
+            try:
+                self._copy_files(new_files, pending_rows)
+            finally:
+                self._record_batch(pending_rows)
             return True
             
         except Exception as e:
             self.logger.error(f"❌ Error copying new files: {e}")
             return False
     
+    def _copy_files(self, new_files: List[Dict], pending_rows: List[Dict]):
+        """Copy each new file, queueing its file record in ``pending_rows``."""
+        for i, record in enumerate(new_files, 1):
+            try:
+                doclist_id = record['Id']
+                original_url = record['Document__c']
+                account_id = record['Account__c']
+                account_name = record['Account__r']['Name'] if record['Account__r'] else 'Unknown'
+                
+                # Clean account name for file path
+                clean_account_name = self._clean_filename(account_name)
+                
+                # Extract file name from URL
+                parsed_url = urlparse(original_url)
+                file_name = os.path.basename(parsed_url.path) or f"file_{doclist_id}"
+                
+                # Generate S3 key
+                s3_key = f"uploads/{account_id}/{clean_account_name}/{file_name}"
+                
+                self.logger.info(f"Copying new file ({i}/{len(new_files)}): {file_name}")
+                
+                if not self.dry_run:
+                    # Download from external S3
+                    content, file_size = self._download_file(original_url)
+                    
+                    # Upload to your S3
+                    your_s3_url = self._upload_to_s3(content, s3_key, file_name)
+                    
+                    # Calculate file hash
+                    file_hash = calculate_file_hash(content, MIGRATION_CONFIG.get("hash_algorithm", "sha256"))
+                    
+                    # Record in database
+                    file_data = {
+                        'doclist_entry_id': doclist_id,
+                        'account_id': account_id,
+                        'account_name': account_name,
+                        'original_url': original_url,
+                        'your_s3_key': s3_key,
+                        'your_s3_url': your_s3_url,
+                        'file_name': file_name,
+                        'file_size_bytes': file_size,
+                        'file_hash': file_hash,
+                        'backup_timestamp': datetime.now().isoformat(),
+                        'last_modified_sf': record.get('LastModifiedDate')
+                    }
+                    
+                    pending_rows.append(file_data)
+                    self.stats['total_size'] += file_size
+                else:
+                    self.logger.info(f"  [DRY RUN] Would copy: {file_name} to {s3_key}")
+                
+                self.stats['new_files'] += 1
+                
+                # Write file records in groups rather than per file
+                if len(pending_rows) >= 1000:
+                    self._record_batch(pending_rows)
+                
+            except Exception as e:
+                self.logger.error(f"Failed to copy new file {record['Id']}: {e}")
+                continue
+    
+    def _record_batch(self, pending_rows: List[Dict]):
+        """Write queued file records in one short transaction and empty the queue."""
+        if pending_rows:
+            with self.db.transaction():
+                self.db.record_file_migrations(pending_rows)
+            pending_rows.clear()
+        # Commits a transaction opened earlier by a buffered-error write, if the block above joined it
+        self.db.flush()
+    
     def update_salesforce_urls(self) -> bool:
         """Update DocListEntry__c.Document__c URLs to point to your S3."""
         try:
@@ -329,7 +363,8 @@ class FullMigration:
                         # Store original URL for rollback
                         self.rollback_data.append({
                             'Id': file_record['doclist_entry_id'],
-                            'original_url': file_record['original_url']
+                            'original_url': file_record['original_url'],
+                            'migrated_url': file_record['your_s3_url']
                         })
                         
                         updates.append({
@@ -374,7 +409,8 @@ class FullMigration:
             
             # Mark files as updated in database
             if updated_ids and not self.dry_run:
-                self.db.mark_salesforce_updated(updated_ids)
+                with self.db.transaction():
+                    self.db.mark_salesforce_updated(updated_ids)
             
             return True
             
@@ -441,12 +477,33 @@ class FullMigration:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             rollback_file = f"rollback_data_{timestamp}.json"
             
-            with open(rollback_file, 'w') as f:
-                json.dump({
-                    'timestamp': datetime.now().isoformat(),
-                    'total_records': len(self.rollback_data),
-                    'records': self.rollback_data
-                }, f, indent=2)
+            manifest = {
+                'timestamp': datetime.now().isoformat(),
+                'total_records': len(self.rollback_data),
+                'records': self.rollback_data
+            }
+            
+            if orjson is not None:
+                data = orjson.dumps(manifest, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+            else:
+                data = (json.dumps(manifest, indent=2) + '\n').encode('utf-8')
+            
+            compression = MIGRATION_CONFIG.get("rollback_compression", "none")
+            if compression == "zstd" and zstandard is None:
+                self.logger.warning("zstandard not installed; writing gzip rollback file instead")
+                compression = "gzip"
+            
+            if compression == "zstd":
+                rollback_file += ".zst"
+                with open(rollback_file, 'wb') as f:
+                    f.write(zstandard.ZstdCompressor().compress(data))
+            elif compression == "gzip":
+                rollback_file += ".gz"
+                with gzip.open(rollback_file, 'wb', compresslevel=6) as f:
+                    f.write(data)
+            else:
+                with open(rollback_file, 'wb') as f:
+                    f.write(data)
             
             self.logger.info(f"✓ Rollback data saved to {rollback_file}")
             
@@ -7,25 +7,249 @@ SQLite database manager for tracking file migrations across phases.
 Handles 1M+ records efficiently with indexing and chunked operations.
 """
 
-import sqlite3
+try:
+    # Optional: pysqlite3-binary bundles a current SQLite amalgamation
+    import pysqlite3 as sqlite3
+except ImportError:
+    import sqlite3
 import json
 import hashlib
-from datetime import datetime
+
+try:
+    # Optional: C-level JSON encoder for large exports
+    import orjson
+    
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    orjson = None
+    
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj)
+
+try:
+    # Optional: SIMD/multithreaded BLAKE3 for content hashing
+    import blake3
+except ImportError:
+    blake3 = None
+
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from itertools import islice
 import logging
+import copy
+import threading
+from contextlib import contextmanager
+
+# Fixed statement text so SQLite's statement cache can reuse one plan for any
+# batch size; ids are bound as a single JSON array (no 999-parameter limit).
+_MARK_SALESFORCE_UPDATED_SQL = '''
+    UPDATE file_migrations 
+    SET salesforce_updated = 1, migration_phase = 2, updated_date = ?
+    WHERE doclist_entry_id IN (SELECT value FROM json_each(?))
+'''
+
+# Generated columns need SQLite 3.31+
+_GENERATED_COLUMNS_SUPPORTED = sqlite3.sqlite_version_info >= (3, 31, 0)
+
+# Index DDL, also replayed by bulk_load after an initial load
+_INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_doclist_entry_id ON file_migrations(doclist_entry_id)",
+    "CREATE INDEX IF NOT EXISTS idx_account_id ON file_migrations(account_id)",
+    "CREATE INDEX IF NOT EXISTS idx_backup_timestamp ON file_migrations(backup_timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_migration_phase ON file_migrations(migration_phase)",
+    # Partial covering index for the Phase 2 worklist (salesforce_updated = 0)
+    "DROP INDEX IF EXISTS idx_salesforce_updated",
+    "CREATE INDEX IF NOT EXISTS idx_fm_phase2 ON file_migrations(account_id, backup_timestamp, doclist_entry_id, original_url, your_s3_url) WHERE salesforce_updated = 0",
+    # Partial covering index for the rollback tool's migrated-files scan (newest first)
+    "CREATE INDEX IF NOT EXISTS idx_fm_sfu_upd ON file_migrations(updated_date, doclist_entry_id, original_url) WHERE salesforce_updated = 1",
+    # Covering index so the per-account GROUP BY in status reports is index-only
+    "CREATE INDEX IF NOT EXISTS idx_fm_account_cover ON file_migrations(account_id, account_name, salesforce_updated, file_size_bytes, backup_timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_run_type ON migration_runs(run_type)",
+    "CREATE INDEX IF NOT EXISTS idx_errors_run_id ON migration_errors(run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_run_start_time ON migration_runs(start_time)",
+    # Partial index for find_incremental_files' "last completed backup" lookup
+    "CREATE INDEX IF NOT EXISTS idx_runs_completed_backup ON migration_runs(start_time DESC) WHERE status = 'completed' AND run_type IN ('backup', 'incremental')"
+)
+if _GENERATED_COLUMNS_SUPPORTED:
+    _INDEX_STATEMENTS += (
+        "CREATE INDEX IF NOT EXISTS idx_fm_backup_unix ON file_migrations(backup_ts_unix)",
+    )
+
+# Bump whenever _create_tables/_create_indexes change; stored in PRAGMA user_version
+SCHEMA_VERSION = 4
+
+# Buffered migration_errors rows are written with one executemany per batch
+ERROR_BATCH_SIZE = 500
+
+# Rows per executemany when staging a bulk load
+BULK_LOAD_BATCH_SIZE = 10000
+
+# INSERT ... ON CONFLICT DO UPDATE needs SQLite 3.24+, RETURNING needs 3.35+
+_UPSERT_SUPPORTED = sqlite3.sqlite_version_info >= (3, 24, 0)
+_UPSERT_RETURNING_SUPPORTED = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_UPSERT_FILE_MIGRATION_SQL = '''
+    INSERT INTO file_migrations (
+        doclist_entry_id, account_id, account_name, original_url,
+        your_s3_key, your_s3_url, file_name, file_size_bytes,
+        file_hash, backup_timestamp, last_modified_sf,
+        created_date, updated_date
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(doclist_entry_id) DO UPDATE SET
+        account_id = excluded.account_id, account_name = excluded.account_name,
+        original_url = excluded.original_url, your_s3_key = excluded.your_s3_key,
+        your_s3_url = excluded.your_s3_url, file_name = excluded.file_name,
+        file_size_bytes = excluded.file_size_bytes, file_hash = excluded.file_hash,
+        backup_timestamp = excluded.backup_timestamp,
+        last_modified_sf = excluded.last_modified_sf,
+        updated_date = excluded.updated_date
+'''
+
+# file_migrations.id is AUTOINCREMENT, so a row is new exactly when its id is
+# above the table's sqlite_sequence value from before the upsert. That tells
+# the caller "inserted vs updated" without probing by doclist_entry_id.
+_UPSERT_FILE_MIGRATION_RETURNING_SQL = _UPSERT_FILE_MIGRATION_SQL + '''
+    RETURNING id
+'''
+_FILE_MIGRATIONS_SEQUENCE_SQL = "SELECT seq FROM sqlite_sequence WHERE name = 'file_migrations'"
+
+
+def _build_file_row(file_data: Dict, now_iso: str) -> Tuple:
+    """Build the file_migrations parameter tuple in upsert column order."""
+    get = file_data.get
+    return (
+        file_data['doclist_entry_id'], file_data['account_id'],
+        file_data['account_name'], file_data['original_url'],
+        file_data['your_s3_key'], file_data['your_s3_url'],
+        file_data['file_name'], get('file_size_bytes'),
+        get('file_hash'), file_data['backup_timestamp'],
+        get('last_modified_sf'), now_iso, now_iso
+    )
+
 
 class MigrationDB:
     """Database manager for migration tracking."""
     
-    def __init__(self, db_path: str = "migration_tracking.db"):
-        """Initialize database connection and create tables if needed."""
+    def __init__(self, db_path: str = "migration_tracking.db", read_only: bool = False):
+        """Initialize database connection and create tables if needed.
+        
+        ``read_only=True`` opens an already up-to-date database with
+        ``mode=ro`` and skips all DDL (for status/reporting tools). An older
+        database is opened normally instead so it gets upgraded once.
+        """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row  # Enable dict-like access
         self.logger = logging.getLogger(__name__)
-        self._create_tables()
-        self._create_indexes()
+        self.read_only = False
+        self.conn = None
+        if read_only:
+            self.conn = self._connect_read_only()
+            if self._schema_version() == SCHEMA_VERSION:
+                self.read_only = True
+            else:
+                self.logger.info("Database schema is outdated; opening read-write to upgrade it")
+                self.conn.close()
+                self.conn = None
+        if self.conn is None:
+            self.conn = self._connect()
+            # WAL lets reader connections proceed while the single writer commits
+            self.conn.execute('PRAGMA journal_mode = WAL')
+        self._writer_thread = threading.get_ident()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._stats_cache = None
+        self._stats_cache_key = None
+        self._error_buffer: List[Tuple] = []
+        # Schema DDL only runs when the stored version is behind, so
+        # re-opening an up-to-date database costs a single PRAGMA read.
+        if not self.read_only and self._schema_version() != SCHEMA_VERSION:
+            self._create_tables()
+            self._create_indexes()
+            # Without generated columns the schema is incomplete; leave the
+            # version unset so a newer SQLite build finishes the upgrade.
+            if _GENERATED_COLUMNS_SUPPORTED:
+                self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        # Enabled after schema setup so the FK upgrade can copy legacy orphan rows
+        self.conn.execute('PRAGMA foreign_keys = ON')
+    
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """Open a connection to the tracking database."""
+        conn = sqlite3.connect(self.db_path, **kwargs)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        return conn
+    
+    def _connect_read_only(self, **kwargs) -> sqlite3.Connection:
+        """Open a read-only connection to an existing tracking database."""
+        db_uri = Path(self.db_path).resolve().as_uri()
+        conn = sqlite3.connect(f"{db_uri}?mode=ro", uri=True, **kwargs)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _schema_version(self) -> int:
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    def _on_writer_thread(self) -> bool:
+        return threading.get_ident() == self._writer_thread
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Connection for read queries.
+        
+        The thread that opened the database reads through the writer
+        connection (so it sees its own uncommitted writes). Any other thread
+        gets its own connection, so status/stat reads from worker or
+        dashboard threads run concurrently under WAL instead of queueing on
+        the writer.
+        """
+        if self._on_writer_thread():
+            return self.conn
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close() can close it; each
+            # reader is used exclusively by the thread that opened it.
+            if self.read_only:
+                conn = self._connect_read_only(check_same_thread=False)
+            else:
+                conn = self._connect(check_same_thread=False)
+            conn.execute('PRAGMA foreign_keys = ON')
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
+    def begin(self):
+        """Open a write transaction unless one is already active."""
+        if not self.conn.in_transaction:
+            self.conn.execute('BEGIN IMMEDIATE')
+    
+    def flush(self):
+        """Commit any pending writes, including buffered errors."""
+        self._flush_error_buffer()
+        if self.conn.in_transaction:
+            self.conn.commit()
+    
+    @contextmanager
+    def transaction(self):
+        """Group writes into a single transaction (one commit per block).
+        
+        Writer methods do not commit on their own; wrap batches of calls in
+        ``with db.transaction():`` so the whole batch shares one commit.
+        Nested blocks join the outer transaction.
+        """
+        if self.conn.in_transaction:
+            yield self
+            return
+        
+        self.begin()
+        try:
+            yield self
+        except Exception:
+            self.conn.rollback()
+            raise
+        else:
+            self.flush()
     
     def _create_tables(self):
         """Create database tables for migration tracking."""
@@ -76,24 +300,121 @@ class MigrationDB:
                 error_message TEXT NOT NULL,
                 original_url TEXT,
                 timestamp TEXT NOT NULL,
-                FOREIGN KEY (run_id) REFERENCES migration_runs(id)
+                FOREIGN KEY (run_id) REFERENCES migration_runs(id) ON DELETE CASCADE
             );
         ''')
         self.conn.commit()
+        self._upgrade_errors_fk()
+        self._create_stats_counters()
+        self._add_backup_ts_unix()
+    
+    def _upgrade_errors_fk(self):
+        """Rebuild migration_errors from older databases so its run FK cascades."""
+        foreign_keys = self.conn.execute('PRAGMA foreign_key_list(migration_errors)').fetchall()
+        if all(fk['on_delete'] == 'CASCADE' for fk in foreign_keys):
+            return
+        
+        self.logger.info("Upgrading migration_errors foreign key to ON DELETE CASCADE")
+        self.conn.executescript('''
+            BEGIN;
+            CREATE TABLE migration_errors_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER,
+                doclist_entry_id TEXT,
+                error_type TEXT NOT NULL,
+                error_message TEXT NOT NULL,
+                original_url TEXT,
+                timestamp TEXT NOT NULL,
+                FOREIGN KEY (run_id) REFERENCES migration_runs(id) ON DELETE CASCADE
+            );
+            INSERT INTO migration_errors_new
+                SELECT id, run_id, doclist_entry_id, error_type, error_message, original_url, timestamp
+                FROM migration_errors;
+            DROP TABLE migration_errors;
+            ALTER TABLE migration_errors_new RENAME TO migration_errors;
+            COMMIT;
+        ''')
+    
+    def _add_backup_ts_unix(self):
+        """Add an integer epoch column derived from backup_timestamp for range scans.
+        
+        SQLite only allows VIRTUAL generated columns via ALTER TABLE; the
+        values are still materialized in idx_fm_backup_unix, which is what
+        the range predicates read.
+        """
+        if not _GENERATED_COLUMNS_SUPPORTED:
+            return
+        
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_xinfo(file_migrations)')}
+        if 'backup_ts_unix' not in columns:
+            self.conn.execute('''
+                ALTER TABLE file_migrations ADD COLUMN backup_ts_unix INTEGER
+                GENERATED ALWAYS AS (CAST(strftime('%s', backup_timestamp) AS INTEGER)) VIRTUAL
+            ''')
+            self.conn.commit()
+    
+    def _create_stats_counters(self):
+        """Create trigger-maintained file counters so stats avoid full scans."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_counters'"
+        ).fetchone()
+        if exists:
+            return
+        
+        # Table, seed values and triggers are created atomically so the
+        # counters always match file_migrations.
+        self.conn.executescript('''
+            BEGIN;
+            CREATE TABLE stats_counters (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            
+            INSERT INTO stats_counters (key, value)
+            SELECT 'total_files', COUNT(*) FROM file_migrations
+            UNION ALL
+            SELECT 'backup_only', COUNT(*) FROM file_migrations WHERE salesforce_updated = 0
+            UNION ALL
+            SELECT 'fully_migrated', COUNT(*) FROM file_migrations WHERE salesforce_updated = 1
+            UNION ALL
+            SELECT 'total_size_bytes', COALESCE(SUM(file_size_bytes), 0) FROM file_migrations;
+            
+            CREATE TRIGGER trg_fm_stats_insert AFTER INSERT ON file_migrations
+            BEGIN
+                UPDATE stats_counters SET value = value + CASE key
+                    WHEN 'total_files' THEN 1
+                    WHEN 'backup_only' THEN NEW.salesforce_updated = 0
+                    WHEN 'fully_migrated' THEN NEW.salesforce_updated = 1
+                    WHEN 'total_size_bytes' THEN COALESCE(NEW.file_size_bytes, 0)
+                END;
+            END;
+            
+            CREATE TRIGGER trg_fm_stats_delete AFTER DELETE ON file_migrations
+            BEGIN
+                UPDATE stats_counters SET value = value - CASE key
+                    WHEN 'total_files' THEN 1
+                    WHEN 'backup_only' THEN OLD.salesforce_updated = 0
+                    WHEN 'fully_migrated' THEN OLD.salesforce_updated = 1
+                    WHEN 'total_size_bytes' THEN COALESCE(OLD.file_size_bytes, 0)
+                END;
+            END;
+            
+            CREATE TRIGGER trg_fm_stats_update
+            AFTER UPDATE OF salesforce_updated, file_size_bytes ON file_migrations
+            BEGIN
+                UPDATE stats_counters SET value = value + CASE key
+                    WHEN 'total_files' THEN 0
+                    WHEN 'backup_only' THEN (NEW.salesforce_updated = 0) - (OLD.salesforce_updated = 0)
+                    WHEN 'fully_migrated' THEN (NEW.salesforce_updated = 1) - (OLD.salesforce_updated = 1)
+                    WHEN 'total_size_bytes' THEN COALESCE(NEW.file_size_bytes, 0) - COALESCE(OLD.file_size_bytes, 0)
+                END;
+            END;
+            COMMIT;
+        ''')
     
     def _create_indexes(self):
         """Create indexes for better query performance."""
-        indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_doclist_entry_id ON file_migrations(doclist_entry_id)",
-            "CREATE INDEX IF NOT EXISTS idx_account_id ON file_migrations(account_id)",
-            "CREATE INDEX IF NOT EXISTS idx_backup_timestamp ON file_migrations(backup_timestamp)",
-            "CREATE INDEX IF NOT EXISTS idx_migration_phase ON file_migrations(migration_phase)",
-            "CREATE INDEX IF NOT EXISTS idx_salesforce_updated ON file_migrations(salesforce_updated)",
-            "CREATE INDEX IF NOT EXISTS idx_run_type ON migration_runs(run_type)",
-            "CREATE INDEX IF NOT EXISTS idx_run_start_time ON migration_runs(start_time)"
-        ]
-        
-        for index_sql in indexes:
+        for index_sql in _INDEX_STATEMENTS:
             self.conn.execute(index_sql)
         self.conn.commit()
     
@@ -113,7 +434,9 @@ class MigrationDB:
             SET end_time = ?, status = ?, error_message = ?
             WHERE id = ?
         ''', (datetime.now().isoformat(), status, error_message, run_id))
+        self._flush_error_buffer()
         self.conn.commit()
+        self.conn.execute('PRAGMA optimize')
     
     def update_run_stats(self, run_id: int, **kwargs):
         """Update migration run statistics."""
@@ -136,14 +459,24 @@ class MigrationDB:
                 SET {", ".join(updates)}
                 WHERE id = ?
             ''', values)
-            self.conn.commit()
     
-    def record_file_migration(self, file_data: Dict) -> bool:
-        """Record or update a file migration entry."""
+    def record_file_migration(self, file_data: Dict, now_iso: Optional[str] = None) -> bool:
+        """Record or update a file migration entry.
+        
+        Pass now_iso to reuse one timestamp across a batch of calls.
+        """
         try:
-            now = datetime.now().isoformat()
+            now = now_iso or datetime.now().isoformat()
             
-            # Check if record exists
+            if _UPSERT_RETURNING_SUPPORTED:
+                # No sequence row yet means the table has never had an insert
+                sequence = self.conn.execute(_FILE_MIGRATIONS_SEQUENCE_SQL).fetchone()
+                row_id = self.conn.execute(
+                    _UPSERT_FILE_MIGRATION_RETURNING_SQL, _build_file_row(file_data, now)
+                ).fetchone()[0]
+                return row_id > (sequence[0] if sequence else 0)
+            
+            # Older SQLite: probe, then update or insert
             existing = self.conn.execute(
                 'SELECT id FROM file_migrations WHERE doclist_entry_id = ?',
                 (file_data['doclist_entry_id'],)
@@ -188,28 +521,150 @@ class MigrationDB:
         except Exception as e:
             self.logger.error(f"Error recording file migration: {e}")
             raise
-        finally:
+    
+    def record_file_migrations(self, file_data_list: Iterable[Dict], now_iso: Optional[str] = None) -> int:
+        """Record or update many file migration entries with one executemany.
+        
+        Unlike record_file_migration this does not report inserted vs
+        updated per row. Returns how many of the rows were new (inserted
+        rather than updated); call it inside a transaction so that count
+        is not skewed by other writers.
+        """
+        now = now_iso or datetime.now().isoformat()
+        if not _UPSERT_SUPPORTED:
+            return sum(1 for file_data in file_data_list if self.record_file_migration(file_data, now))
+        
+        rows = [_build_file_row(file_data, now) for file_data in file_data_list]
+        if not rows:
+            return 0
+        # New rows take ids above the AUTOINCREMENT high-water mark; updates keep theirs
+        sequence = self.conn.execute(_FILE_MIGRATIONS_SEQUENCE_SQL).fetchone()
+        seq = sequence[0] if sequence else 0
+        self.conn.executemany(_UPSERT_FILE_MIGRATION_SQL, rows)
+        return self.conn.execute('SELECT COUNT(*) FROM file_migrations WHERE id > ?', (seq,)).fetchone()[0]
+    
+    def bulk_load(self, rows: Iterable[Dict]) -> int:
+        """Bulk-insert file migration records (same dicts as record_file_migration).
+        
+        Rows are staged in an attached in-memory database and copied into
+        file_migrations with a single INSERT ... SELECT, so the main file is
+        written sequentially in one transaction. When file_migrations is
+        empty (initial load), its secondary indexes are dropped first and
+        rebuilt afterwards. Existing doclist_entry_ids are updated in place.
+        Returns the number of rows loaded.
+        """
+        self.flush()  # ATTACH is not allowed inside a transaction
+        now = datetime.now().isoformat()
+        columns = (
+            'doclist_entry_id, account_id, account_name, original_url, '
+            'your_s3_key, your_s3_url, file_name, file_size_bytes, '
+            'file_hash, backup_timestamp, last_modified_sf, created_date, updated_date'
+        )
+        
+        self.conn.execute("ATTACH DATABASE ':memory:' AS stage")
+        try:
+            self.conn.execute('''
+                CREATE TABLE stage.file_migrations (
+                    doclist_entry_id TEXT, account_id TEXT, account_name TEXT,
+                    original_url TEXT, your_s3_key TEXT, your_s3_url TEXT,
+                    file_name TEXT, file_size_bytes INTEGER, file_hash TEXT,
+                    backup_timestamp TEXT, last_modified_sf TEXT,
+                    created_date TEXT, updated_date TEXT
+                )
+            ''')
+            
+            loaded = 0
+            row_iter = iter(rows)
+            while True:
+                batch = [
+                    _build_file_row(r, now)
+                    for r in islice(row_iter, BULK_LOAD_BATCH_SIZE)
+                ]
+                if not batch:
+                    break
+                self.conn.executemany(
+                    f'INSERT INTO stage.file_migrations ({columns}) VALUES ({", ".join("?" * 13)})',
+                    batch
+                )
+                loaded += len(batch)
             self.conn.commit()
+            
+            initial_load = self.conn.execute(
+                'SELECT NOT EXISTS (SELECT 1 FROM main.file_migrations)'
+            ).fetchone()[0]
+            
+            with self.transaction():
+                if initial_load:
+                    # Build indexes once after the load instead of per row
+                    index_names = [row[0] for row in self.conn.execute(
+                        "SELECT name FROM main.sqlite_master "
+                        "WHERE type = 'index' AND tbl_name = 'file_migrations' AND sql IS NOT NULL"
+                    )]
+                    for name in index_names:
+                        self.conn.execute(f'DROP INDEX main.{name}')
+                
+                # WHERE true disambiguates the upsert clause after a SELECT
+                self.conn.execute(f'''
+                    INSERT INTO main.file_migrations ({columns})
+                    SELECT {columns} FROM stage.file_migrations WHERE true
+                    ON CONFLICT(doclist_entry_id) DO UPDATE SET
+                        account_id = excluded.account_id, account_name = excluded.account_name,
+                        original_url = excluded.original_url, your_s3_key = excluded.your_s3_key,
+                        your_s3_url = excluded.your_s3_url, file_name = excluded.file_name,
+                        file_size_bytes = excluded.file_size_bytes, file_hash = excluded.file_hash,
+                        backup_timestamp = excluded.backup_timestamp,
+                        last_modified_sf = excluded.last_modified_sf,
+                        updated_date = excluded.updated_date
+                ''')
+                
+                if initial_load:
+                    for index_sql in _INDEX_STATEMENTS:
+                        self.conn.execute(index_sql)
+        finally:
+            self.flush()
+            self.conn.execute('DETACH DATABASE stage')
+        
+        self.logger.info(f"Bulk loaded {loaded} file migration records")
+        return loaded
     
     def record_migration_error(self, run_id: int, doclist_entry_id: str, 
-                              error_type: str, error_message: str, original_url: str = None):
-        """Record a migration error."""
-        self.conn.execute('''
-            INSERT INTO migration_errors (run_id, doclist_entry_id, error_type, error_message, original_url, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (run_id, doclist_entry_id, error_type, error_message, original_url, datetime.now().isoformat()))
-        self.conn.commit()
+                              error_type: str, error_message: str, original_url: str = None,
+                              now_iso: Optional[str] = None):
+        """Record a migration error (buffered; written every ERROR_BATCH_SIZE errors)."""
+        self._error_buffer.append(
+            (run_id, doclist_entry_id, error_type, error_message, original_url,
+             now_iso or datetime.now().isoformat())
+        )
+        if len(self._error_buffer) >= ERROR_BATCH_SIZE:
+            self._flush_error_buffer()
+    
+    def _flush_error_buffer(self):
+        """Write buffered migration errors in a single executemany."""
+        if not self._error_buffer:
+            return
+        # Swap the buffer out first so a failed insert cannot replay the same rows on every later write
+        rows, self._error_buffer = self._error_buffer, []
+        try:
+            self.conn.executemany('''
+                INSERT INTO migration_errors (run_id, doclist_entry_id, error_type, error_message, original_url, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+        except Exception as e:
+            self.logger.error(f"Dropped {len(rows)} buffered migration errors that could not be written: {e}")
+            for run_id, doclist_entry_id, error_type, error_message, original_url, timestamp in rows:
+                self.logger.error(f"  {timestamp} run {run_id} {doclist_entry_id} [{error_type}] {error_message} ({original_url})")
+            raise
     
     def get_backed_up_files(self) -> List[sqlite3.Row]:
         """Get all backed up files."""
-        return self.conn.execute('''
+        return self._conn().execute('''
             SELECT * FROM file_migrations 
             ORDER BY backup_timestamp DESC
         ''').fetchall()
     
     def get_files_for_account(self, account_id: str) -> List[sqlite3.Row]:
         """Get all files for a specific account."""
-        return self.conn.execute('''
+        return self._conn().execute('''
             SELECT * FROM file_migrations 
             WHERE account_id = ?
             ORDER BY backup_timestamp DESC
@@ -217,43 +672,57 @@ class MigrationDB:
     
     def get_files_needing_salesforce_update(self) -> List[sqlite3.Row]:
         """Get files that need Salesforce URL updates (Phase 2)."""
-        return self.conn.execute('''
-            SELECT * FROM file_migrations 
+        return self._conn().execute('''
+            SELECT doclist_entry_id, account_id, original_url, your_s3_url, backup_timestamp
+            FROM file_migrations 
             WHERE salesforce_updated = 0
             ORDER BY account_id, backup_timestamp
         ''').fetchall()
     
-    def mark_salesforce_updated(self, doclist_entry_ids: List[str]):
+    def mark_salesforce_updated(self, doclist_entry_ids: List[str], now_iso: Optional[str] = None):
         """Mark files as having Salesforce URLs updated."""
         if not doclist_entry_ids:
             return
             
-        placeholders = ','.join('?' * len(doclist_entry_ids))
-        self.conn.execute(f'''
-            UPDATE file_migrations 
-            SET salesforce_updated = 1, migration_phase = 2, updated_date = ?
-            WHERE doclist_entry_id IN ({placeholders})
-        ''', [datetime.now().isoformat()] + doclist_entry_ids)
+        self.conn.execute(
+            _MARK_SALESFORCE_UPDATED_SQL,
+            (now_iso or datetime.now().isoformat(), json.dumps(list(doclist_entry_ids)))
+        )
+    
+    def analyze(self):
+        """Refresh planner statistics (run after bulk loads)."""
+        self.conn.execute('ANALYZE')
         self.conn.commit()
     
     def get_migration_stats(self) -> Dict:
         """Get comprehensive migration statistics."""
+        if self._on_writer_thread():
+            self._flush_error_buffer()
+        conn = self._conn()
+        
+        # Reuse the previous result until the writer connection changes data
+        # or another connection commits (PRAGMA data_version changes).
+        cache_key = (
+            id(conn),
+            self.conn.total_changes,
+            conn.execute('PRAGMA data_version').fetchone()[0]
+        )
+        if self._stats_cache is not None and cache_key == self._stats_cache_key:
+            return copy.deepcopy(self._stats_cache)
+        
         stats = {}
         
-        # Overall file stats
-        cursor = self.conn.execute('''
-            SELECT 
-                COUNT(*) as total_files,
-                SUM(CASE WHEN salesforce_updated = 0 THEN 1 ELSE 0 END) as backup_only,
-                SUM(CASE WHEN salesforce_updated = 1 THEN 1 ELSE 0 END) as fully_migrated,
-                SUM(file_size_bytes) as total_size_bytes,
-                COUNT(DISTINCT account_id) as unique_accounts
-            FROM file_migrations
-        ''')
-        stats['files'] = dict(cursor.fetchone())
+        # Overall file stats (counters are maintained by triggers)
+        stats['files'] = {
+            row['key']: row['value']
+            for row in conn.execute('SELECT key, value FROM stats_counters')
+        }
+        stats['files']['unique_accounts'] = conn.execute(
+            'SELECT COUNT(DISTINCT account_id) FROM file_migrations'
+        ).fetchone()[0]
         
         # Recent run stats
-        cursor = self.conn.execute('''
+        cursor = conn.execute('''
             SELECT run_type, COUNT(*) as count, MAX(start_time) as last_run
             FROM migration_runs
             GROUP BY run_type
@@ -262,7 +731,7 @@ class MigrationDB:
         stats['runs'] = [dict(row) for row in cursor.fetchall()]
         
         # Error summary
-        cursor = self.conn.execute('''
+        cursor = conn.execute('''
             SELECT error_type, COUNT(*) as count
             FROM migration_errors
             GROUP BY error_type
@@ -270,73 +739,122 @@ class MigrationDB:
         ''')
         stats['errors'] = [dict(row) for row in cursor.fetchall()]
         
-        return stats
+        self._stats_cache = stats
+        self._stats_cache_key = cache_key
+        return copy.deepcopy(stats)
     
     def find_incremental_files(self, last_backup_time: str = None) -> List[str]:
         """Find DocListEntry IDs that need incremental backup."""
         if not last_backup_time:
             # Get timestamp of last successful backup run
-            cursor = self.conn.execute('''
-                SELECT MAX(start_time) 
+            cursor = self._conn().execute('''
+                SELECT start_time 
                 FROM migration_runs 
-                WHERE run_type IN ('backup', 'incremental') AND status = 'completed'
+                WHERE status = 'completed' AND run_type IN ('backup', 'incremental')
+                ORDER BY start_time DESC
+                LIMIT 1
             ''')
             result = cursor.fetchone()
-            last_backup_time = result[0] if result[0] else '1970-01-01T00:00:00'
+            last_backup_time = result[0] if result else '1970-01-01T00:00:00'
         
         # Return all DocListEntry IDs backed up after the specified time
         # This will be compared against current Salesforce data to find new/changed files
-        cursor = self.conn.execute('''
-            SELECT doclist_entry_id 
-            FROM file_migrations 
-            WHERE backup_timestamp > ?
-        ''', (last_backup_time,))
+        if _GENERATED_COLUMNS_SUPPORTED:
+            # Seek the integer index on whole seconds, then apply the exact
+            # string comparison to the rows in the boundary second.
+            cursor = self._conn().execute('''
+                SELECT doclist_entry_id 
+                FROM file_migrations 
+                WHERE backup_ts_unix >= CAST(strftime('%s', ?) AS INTEGER)
+                AND backup_timestamp > ?
+            ''', (last_backup_time, last_backup_time))
+        else:
+            cursor = self._conn().execute('''
+                SELECT doclist_entry_id 
+                FROM file_migrations 
+                WHERE backup_timestamp > ?
+            ''', (last_backup_time,))
         
         return [row[0] for row in cursor.fetchall()]
     
     def cleanup_old_runs(self, keep_days: int = 30):
         """Clean up old migration runs and errors."""
-        cutoff_date = datetime.now().replace(day=datetime.now().day - keep_days).isoformat()
+        now = datetime.now()
+        cutoff_date = (now - timedelta(days=keep_days)).isoformat()
         
-        # Delete old errors first (foreign key constraint)
-        self.conn.execute('''
-            DELETE FROM migration_errors 
-            WHERE run_id IN (
-                SELECT id FROM migration_runs WHERE start_time < ?
-            )
-        ''', (cutoff_date,))
-        
-        # Delete old runs
+        # Errors for deleted runs go with them via ON DELETE CASCADE
         self.conn.execute('DELETE FROM migration_runs WHERE start_time < ?', (cutoff_date,))
         self.conn.commit()
     
-    def export_metadata(self, output_file: str = None) -> str:
-        """Export migration metadata to JSON for backup/inspection."""
-        if not output_file:
-            output_file = f"migration_metadata_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    def export_metadata(self, output_file: str = None, ndjson: bool = False) -> str:
+        """Export migration metadata to JSON for backup/inspection.
         
-        # Export file migrations
-        files = self.conn.execute('SELECT * FROM file_migrations ORDER BY backup_timestamp').fetchall()
-        runs = self.conn.execute('SELECT * FROM migration_runs ORDER BY start_time').fetchall()
+        With ndjson=True the output is newline-delimited JSON: a header
+        object (export_timestamp, total_files, runs, stats) on the first
+        line, then one file record per line.
+        """
+        if not output_file:
+            extension = 'ndjson' if ndjson else 'json'
+            output_file = f"migration_metadata_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
         
-        export_data = {
-            'export_timestamp': datetime.now().isoformat(),
-            'total_files': len(files),
-            'files': [dict(row) for row in files],
-            'runs': [dict(row) for row in runs],
-            'stats': self.get_migration_stats()
-        }
+        stats = self.get_migration_stats()
+        runs = [dict(row) for row in self._conn().execute('SELECT * FROM migration_runs ORDER BY start_time')]
+        export_timestamp = datetime.now().isoformat()
         
+        # Stream file rows straight from the cursor so the full table is
+        # never materialized in memory (1M+ rows).
+        cursor = self._conn().execute('SELECT * FROM file_migrations ORDER BY backup_timestamp')
         with open(output_file, 'w') as f:
-            json.dump(export_data, f, indent=2)
+            if ndjson:
+                f.write(_json_dumps({
+                    'export_timestamp': export_timestamp,
+                    'total_files': stats['files']['total_files'],
+                    'runs': runs,
+                    'stats': stats
+                }))
+                f.write('\n')
+                for row in cursor:
+                    f.write(_json_dumps(dict(row)))
+                    f.write('\n')
+            else:
+                f.write('{\n')
+                f.write(f'  "export_timestamp": {_json_dumps(export_timestamp)},\n')
+                f.write(f'  "total_files": {stats["files"]["total_files"]},\n')
+                f.write('  "files": [')
+                
+                separator = '\n    '
+                for row in cursor:
+                    f.write(separator)
+                    f.write(_json_dumps(dict(row)))
+                    separator = ',\n    '
+                
+                f.write('\n  ],\n')
+                f.write(f'  "runs": {_json_dumps(runs)},\n')
+                f.write(f'  "stats": {_json_dumps(stats)}\n')
+                f.write('}\n')
         
         self.logger.info(f"Exported metadata to {output_file}")
         return output_file
     
     def close(self):
-        """Close database connection."""
-        if self.conn:
+        """Close database connection, committing any pending writes."""
+        if self.conn and self.read_only:
+            self.conn.close()
+        elif self.conn:
+            self.flush()
+            if self.conn.total_changes:
+                # Checkpoint what it can without waiting on other writers (no-op
+                # in rollback-journal mode) and let SQLite refresh planner stats
+                # for tables whose shape changed. Skipped for connections that
+                # wrote nothing, e.g. the dashboard's per-refresh handle.
+                self.conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+                self.conn.execute('PRAGMA optimize')
             self.conn.close()
+        
+        with self._readers_lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
     
     def __enter__(self):
         """Context manager entry."""
@@ -347,11 +865,44 @@ class MigrationDB:
         self.close()
 
 
-def calculate_file_hash(file_content: bytes) -> str:
-    """Calculate SHA-256 hash of file content."""
+def calculate_file_hash(file_content: bytes, algorithm: str = 'sha256') -> str:
+    """Calculate hash of file content.
+    
+    SHA-256 (the default) is stored as bare hex, as it always has been.
+    ``algorithm='blake3'`` stores ``blake3:<hex>`` so both kinds can coexist
+    in the ``file_hash`` column; it falls back to SHA-256 if the blake3
+    package is not installed.
+    """
+    if algorithm == 'blake3' and blake3 is not None:
+        h = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        h.update(file_content)
+        return f"blake3:{h.hexdigest()}"
     return hashlib.sha256(file_content).hexdigest()
 
 
+def calculate_file_hash_blake3(path: str) -> str:
+    """Calculate BLAKE3 hash of a file on disk via mmap, using all cores."""
+    if blake3 is None:
+        raise ImportError("blake3 is not installed (pip install blake3)")
+    h = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    h.update_mmap(path)
+    return f"blake3:{h.hexdigest()}"
+
+
+def calculate_file_hash_stream(fp) -> str:
+    """Calculate SHA-256 hash of a binary file object in constant memory.
+    
+    Usage: ``with open(path, 'rb') as f: calculate_file_hash_stream(f)``
+    """
+    if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+        return hashlib.file_digest(fp, 'sha256').hexdigest()
+    
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
 if __name__ == "__main__":
     # Test the database functionality
     with MigrationDB() as db:
@@ -39,6 +39,12 @@ def format_datetime(dt_string):
     except:
         return dt_string
 
+def tuple_cursor(db):
+    """Return a cursor yielding plain tuples (no sqlite3.Row name lookups)."""
+    cursor = db.conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
 def print_overview(db):
     """Print migration overview."""
     stats = db.get_migration_stats()
@@ -74,8 +80,11 @@ def print_recent_runs(db):
     print("RECENT MIGRATION RUNS")
     print("-" * 80)
     
-    runs = db.conn.execute('''
-        SELECT * FROM migration_runs 
+    runs = tuple_cursor(db).execute('''
+        SELECT run_type, status, start_time, end_time,
+               CAST((julianday(end_time) - julianday(start_time)) * 86400 AS INTEGER) AS duration_s,
+               total_files_processed, successful_files
+        FROM migration_runs 
         ORDER BY start_time DESC 
         LIMIT 10
     ''').fetchall()
@@ -87,24 +96,22 @@ def print_recent_runs(db):
     print(f"{'Type':<15} {'Status':<12} {'Start Time':<20} {'Duration':<12} {'Files':<8} {'Success':<8}")
     print("-" * 80)
     
-    for run in runs:
-        run_type = run['run_type']
-        status = run['status']
-        start_time = format_datetime(run['start_time'])[:19]  # Truncate seconds
+    for run_type, status, start_time, end_time, duration_s, total_files, successful in runs:
+        start_time = format_datetime(start_time)[:19]  # Truncate seconds
         
-        # Calculate duration
-        if run['end_time']:
-            try:
-                start_dt = datetime.fromisoformat(run['start_time'])
-                end_dt = datetime.fromisoformat(run['end_time'])
-                duration = str(end_dt - start_dt).split('.')[0]  # Remove microseconds
-            except:
+        # Duration is computed in SQL; NULL if a timestamp is missing or unparseable
+        if end_time:
+            if duration_s is not None:
+                hours, remainder = divmod(duration_s, 3600)
+                minutes, seconds = divmod(remainder, 60)
+                duration = f"{hours}:{minutes:02d}:{seconds:02d}"
+            else:
                 duration = "Unknown"
         else:
             duration = "Running..." if status == 'running' else "Unknown"
         
-        total_files = run['total_files_processed'] or 0
-        successful = run['successful_files'] or 0
+        total_files = total_files or 0
+        successful = successful or 0
         
         print(f"{run_type:<15} {status:<12} {start_time:<20} {duration:<12} {total_files:<8} {successful:<8}")
     
@@ -115,9 +122,8 @@ def print_account_breakdown(db, limit=20):
     print(f"TOP {limit} ACCOUNTS BY FILE COUNT")
     print("-" * 80)
     
-    accounts = db.conn.execute('''
+    accounts = tuple_cursor(db).execute('''
         SELECT 
-            account_id,
             account_name,
             COUNT(*) as file_count,
             SUM(file_size_bytes) as total_size,
@@ -136,12 +142,10 @@ def print_account_breakdown(db, limit=20):
     print(f"{'Account Name':<30} {'Files':<8} {'Size':<12} {'Migrated':<10} {'Last Backup':<20}")
     print("-" * 80)
     
-    for account in accounts:
-        name = account['account_name'][:29] if account['account_name'] else 'Unknown'
-        file_count = account['file_count']
-        size = format_size(account['total_size'])
-        migrated = account['migrated_count']
-        last_backup = format_datetime(account['last_backup'])[:19]
+    for account_name, file_count, total_size, last_backup, migrated in accounts:
+        name = account_name[:29] if account_name else 'Unknown'
+        size = format_size(total_size)
+        last_backup = format_datetime(last_backup)[:19]
         
         print(f"{name:<30} {file_count:<8} {size:<12} {migrated:<10} {last_backup:<20}")
     
@@ -152,7 +156,7 @@ def print_error_summary(db):
     print("ERROR SUMMARY")
     print("-" * 80)
     
-    errors = db.conn.execute('''
+    errors = tuple_cursor(db).execute('''
         SELECT 
             error_type,
             COUNT(*) as error_count,
@@ -169,10 +173,8 @@ def print_error_summary(db):
     print(f"{'Error Type':<25} {'Count':<8} {'Latest Occurrence':<20}")
     print("-" * 80)
     
-    for error in errors:
-        error_type = error['error_type']
-        count = error['error_count']
-        latest = format_datetime(error['latest_error'])[:19]
+    for error_type, count, latest_error in errors:
+        latest = format_datetime(latest_error)[:19]
         
         print(f"{error_type:<25} {count:<8} {latest:<20}")
     
@@ -311,7 +313,7 @@ def main():
         sys.exit(1)
     
     try:
-        with MigrationDB(str(db_path)) as db:
+        with MigrationDB(str(db_path), read_only=True) as db:
             # Default to overview if no specific option
             if not any([args.runs, args.accounts, args.errors, args.recent_errors, 
                        args.readiness, args.export, args.all]):
@@ -15,16 +15,32 @@ python reverse_engineer_pdf_viewer.py
 """
 
 import os
+import re
+import heapq
 import sys
 import logging
 import requests
 import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from urllib.parse import urlparse
-from simple_salesforce import Salesforce
+from simple_salesforce import Salesforce, format_soql
 from simple_salesforce.exceptions import SalesforceError
 
+try:
+    # Optional: C-level JSON encoder for the (large) saved analysis
+    import orjson
+    
+    def _json_dump_bytes(obj) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2)
+except ImportError:
+    orjson = None
+    
+    def _json_dump_bytes(obj) -> bytes:
+        return json.dumps(obj, indent=2, default=str).encode()
+
 # Import configuration
 try:
     from config import SALESFORCE_CONFIG, MIGRATION_CONFIG
@@ -34,6 +50,60 @@ except ImportError:
     sys.exit(1)
 
 
+# Patterns are compiled once at import instead of per record inside the loops
+_RE_ANNOTATION = re.compile(r'@(RestResource|HttpGet|HttpPost)')
+_RE_REST_RESOURCE = re.compile(r'@RestResource\s*\(\s*urlMapping\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+_RE_HTTP_METHOD = re.compile(
+    r'@Http(Get|Post|Put|Delete|Patch)\s+(?:global\s+)?(?:static\s+)?[\w\s<>]+\s+(\w+)\s*\([^)]*\)',
+    re.IGNORECASE | re.MULTILINE
+)
+_RE_SCRIPT = re.compile(r'<script[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+_RE_IFRAME_SRC = re.compile(r'<iframe[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
+# Only URLs that point at S3/trackland storage
+_RE_S3_URL = re.compile(r'https?://[^\s"\'<>]*(?:amazonaws|trackland|s3)[^\s"\'<>]*')
+
+# REST call patterns for Visualforce markup and Aura controller/helper JS,
+# fused into one alternation each so the buffer is scanned once
+_RE_VF_REST_CALLS = re.compile(
+    r'/services/apexrest/[^\s"\'<>]+'
+    r'|\.apex\s*\(\s*["\'](?P<apex>[^"\']+)["\']'
+    r'|callout:[^\s"\'<>]+'
+    r'|Remote\.Manager\.invokeAction',
+    re.IGNORECASE
+)
+_RE_AURA_REST_CALLS = re.compile(
+    r'/services/apexrest/[^\s"\'<>]+'
+    r'|callout:[^\s"\'<>]+'
+    r'|\$A\.enqueueAction'
+    r'|action\.setCallback',
+    re.IGNORECASE
+)
+
+# Aura definition types whose source is JavaScript worth scanning
+_AURA_JS_DEF_TYPES = frozenset(('CONTROLLER', 'HELPER'))
+
+# Keywords that make a JS block worth previewing in the report
+_VF_JS_PREVIEW_KEYWORDS = ('url', 'endpoint', 'document', 'file')
+_AURA_JS_PREVIEW_KEYWORDS = ('url', 'endpoint', 'document')
+
+# IDs per SOQL IN-query (keeps the statement well under length limits)
+SOQL_ID_BATCH_SIZE = 200
+
+# Concurrent HTTP probes against candidate proxy endpoints
+PROBE_WORKERS = 16
+# Bytes read from each probe response (enough for a preview and a size hint)
+PROBE_READ_BYTES = 4096
+
+# Endpoints (by file relevance) that keep their body_preview after sorting
+ENDPOINT_PREVIEW_LIMIT = 20
+
+# Body/Markup/Source value Salesforce returns for managed-package code
+HIDDEN_SOURCE = '(hidden)'
+
+# Keywords that suggest an Apex REST endpoint handles file access
+_FILE_KEYWORDS = ('file', 'download', 'document', 'pdf', 'content', 'stream', 'blob', 's3', 'proxy')
+
+
 def setup_logging() -> logging.Logger:
     """Set up logging configuration."""
     logging.basicConfig(
@@ -53,6 +123,12 @@ class PDFViewerReverseEngineer:
         self.logger = logger
         self.sf = None
         
+        # Keep-alive session shared by the concurrent endpoint probes
+        self.http = requests.Session()
+        self.http.headers.update({'Content-Type': 'application/json'})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=PROBE_WORKERS, pool_maxsize=PROBE_WORKERS * 2)
+        self.http.mount('https://', adapter)
+        
     def authenticate(self) -> bool:
         """Authenticate with Salesforce."""
         try:
@@ -78,9 +154,10 @@ class PDFViewerReverseEngineer:
         try:
             self.logger.info("🔍 Finding all REST API endpoints...")
             
-            # Look for Apex REST classes
+            # Look for Apex REST classes; Body is filtered on but only
+            # downloaded below for classes that can be file-relevant
             rest_query = """
-                SELECT Id, Name, NamespacePrefix, Body, CreatedDate, LastModifiedDate
+                SELECT Id, Name, NamespacePrefix, CreatedDate, LastModifiedDate
                 FROM ApexClass
                 WHERE (Body LIKE '%@RestResource%'
                    OR Body LIKE '%@HttpGet%'
@@ -93,38 +170,57 @@ class PDFViewerReverseEngineer:
             rest_endpoints = []
             
             try:
-                result = self.sf.query(rest_query)
+                # Metadata rows are small; bodies are streamed separately
+                class_records = list(self.sf.query_all_iter(rest_query))
+                bodies = self._fetch_file_relevant_bodies([r['Id'] for r in class_records])
+                add_endpoint = rest_endpoints.append
                 
-                for record in result['records']:
-                    body = record.get('Body', '')
+                for record in class_records:
+                    # Classes without file keywords have relevance 0 and are never shown
+                    body = bodies.get(record['Id'], '')
+                    if not body:
+                        add_endpoint({
+                            'id': record['Id'],
+                            'name': record['Name'],
+                            'namespace': record.get('NamespacePrefix'),
+                            'url_pattern': None,
+                            'methods': [],
+                            'method_signatures': [],
+                            'file_relevance': 0,
+                            'body_preview': '',
+                            'created_date': record['CreatedDate'],
+                            'modified_date': record['LastModifiedDate']
+                        })
+                        continue
+                    
+                    # One pass to see which REST annotations the class uses
+                    annotations = set(_RE_ANNOTATION.findall(body))
                     
                     # Extract REST resource URL pattern
                     url_pattern = None
-                    if '@RestResource' in body:
-                        import re
-                        url_match = re.search(r'@RestResource\s*\(\s*urlMapping\s*=\s*["\']([^"\']+)["\']', body, re.IGNORECASE)
+                    if 'RestResource' in annotations:
+                        url_match = _RE_REST_RESOURCE.search(body)
                         if url_match:
                             url_pattern = url_match.group(1)
                     
                     # Look for file/download related methods
                     methods = []
-                    if '@HttpGet' in body:
+                    if 'HttpGet' in annotations:
                         methods.append('GET')
-                    if '@HttpPost' in body:
+                    if 'HttpPost' in annotations:
                         methods.append('POST')
                     
                     # Extract method signatures
                     method_signatures = []
-                    method_pattern = r'@Http(Get|Post|Put|Delete|Patch)\s+(?:global\s+)?(?:static\s+)?[\w\s<>]+\s+(\w+)\s*\([^)]*\)'
-                    method_matches = re.findall(method_pattern, body, re.IGNORECASE | re.MULTILINE)
+                    method_matches = _RE_HTTP_METHOD.findall(body)
                     for http_method, method_name in method_matches:
                         method_signatures.append(f"{http_method.upper()} {method_name}")
                     
                     # Check if this endpoint might handle files
-                    file_keywords = ['file', 'download', 'document', 'pdf', 'content', 'stream', 'blob', 's3', 'proxy']
-                    file_relevance = sum(1 for keyword in file_keywords if keyword.lower() in body.lower())
+                    body_lower = body.lower()
+                    file_relevance = sum(1 for keyword in _FILE_KEYWORDS if keyword in body_lower)
                     
-                    rest_endpoints.append({
+                    add_endpoint({
                         'id': record['Id'],
                         'name': record['Name'],
                         'namespace': record.get('NamespacePrefix'),
@@ -132,14 +228,22 @@ class PDFViewerReverseEngineer:
                         'methods': methods,
                         'method_signatures': method_signatures,
                         'file_relevance': file_relevance,
-                        'body_preview': body[:800] + "..." if len(body) > 800 else body,
+                        'body_preview': body[:800] + ('...' if len(body) > 800 else ''),
                         'created_date': record['CreatedDate'],
                         'modified_date': record['LastModifiedDate']
                     })
                 
-                # Sort by file relevance
-                rest_endpoints.sort(key=lambda x: x['file_relevance'], reverse=True)
-                return rest_endpoints
+                # Only the most relevant endpoints are ever inspected, so rank
+                # just the top ones; the long tail is kept (unordered) for the
+                # totals and its previews are released.
+                top_endpoints = heapq.nlargest(
+                    ENDPOINT_PREVIEW_LIMIT, rest_endpoints, key=lambda x: x['file_relevance']
+                )
+                top_ids = {endpoint['id'] for endpoint in top_endpoints}
+                other_endpoints = [e for e in rest_endpoints if e['id'] not in top_ids]
+                for endpoint in other_endpoints:
+                    endpoint.pop('body_preview', None)
+                return top_endpoints + other_endpoints
                 
             except Exception as e:
                 self.logger.error(f"Error querying REST endpoints: {e}")
@@ -149,6 +253,30 @@ class PDFViewerReverseEngineer:
             self.logger.error(f"❌ Error finding REST endpoints: {e}")
             return []
     
+    def _fetch_file_relevant_bodies(self, class_ids: List[str]) -> Dict[str, str]:
+        """Fetch Apex class bodies, limited to classes mentioning a file keyword."""
+        keyword_filter = ' OR '.join(f"Body LIKE '%{keyword}%'" for keyword in _FILE_KEYWORDS)
+        bodies = {}
+        
+        for start in range(0, len(class_ids), SOQL_ID_BATCH_SIZE):
+            body_query = format_soql(
+                """
+                SELECT Id, Body
+                FROM ApexClass
+                WHERE Id IN {ids}
+                AND ({keyword_filter:literal})
+                """,
+                ids=class_ids[start:start + SOQL_ID_BATCH_SIZE],
+                keyword_filter=keyword_filter
+            )
+            
+            for record in self.sf.query_all_iter(body_query):
+                body = record.get('Body')
+                if body and body != HIDDEN_SOURCE:
+                    bodies[record['Id']] = body
+        
+        return bodies
+    
     def examine_pdf_viewer_components(self) -> Dict:
         """Examine the PDF viewer Lightning components and Visualforce pages in detail."""
         try:
@@ -168,47 +296,39 @@ class PDFViewerReverseEngineer:
                 WHERE (Name LIKE '%PDF%' OR Name LIKE '%pdf%'
                    OR Name LIKE '%View%' OR Name LIKE '%view%'
                    OR Name LIKE '%Doc%' OR Name LIKE '%doc%')
+                AND (Markup LIKE '%amazonaws%' OR Markup LIKE '%s3%'
+                   OR Markup LIKE '%trackland%' OR Markup LIKE '%/services/apexrest%'
+                   OR Markup LIKE '%<iframe%' OR Markup LIKE '%http%')
                 ORDER BY Name
             """
             
             try:
-                vf_result = self.sf.query(vf_query)
+                add_page = components_analysis['visualforce_pages'].append
                 
-                for record in vf_result['records']:
-                    markup = record.get('Markup', '')
+                # Stream pages so each markup can be released once analyzed
+                for record in self.sf.query_all_iter(vf_query):
+                    markup = record.get('Markup') or ''
+                    if not markup or markup == HIDDEN_SOURCE:
+                        continue
                     
                     # Extract JavaScript code
                     js_code = []
-                    import re
-                    js_matches = re.findall(r'<script[^>]*>(.*?)</script>', markup, re.DOTALL | re.IGNORECASE)
+                    js_matches = _RE_SCRIPT.findall(markup)
                     for js_match in js_matches:
                         if js_match.strip():
                             js_code.append(js_match.strip())
                     
                     # Extract iframe sources or other external content references
-                    iframe_sources = re.findall(r'<iframe[^>]+src=["\']([^"\']+)["\']', markup, re.IGNORECASE)
+                    iframe_sources = _RE_IFRAME_SRC.findall(markup)
                     
                     # Extract any URL patterns or endpoint references
-                    url_patterns = []
-                    url_matches = re.findall(r'https?://[^\s"\'<>]+', markup)
-                    for url in url_matches:
-                        if 'amazonaws' in url or 'trackland' in url or 's3' in url:
-                            url_patterns.append(url)
+                    url_patterns = _RE_S3_URL.findall(markup)
                     
                     # Look for REST endpoint calls
-                    rest_calls = []
-                    rest_patterns = [
-                        r'/services/apexrest/[^\s"\'<>]+',
-                        r'\.apex\s*\(\s*["\']([^"\']+)["\']',
-                        r'callout:[^\s"\'<>]+',
-                        r'Remote\.Manager\.invokeAction'
-                    ]
+                    # .apex('...') calls report just the action name
+                    rest_calls = [m.group('apex') or m.group(0) for m in _RE_VF_REST_CALLS.finditer(markup)]
                     
-                    for pattern in rest_patterns:
-                        rest_matches = re.findall(pattern, markup, re.IGNORECASE)
-                        rest_calls.extend(rest_matches)
-                    
-                    components_analysis['visualforce_pages'].append({
+                    add_page({
                         'id': record['Id'],
                         'name': record['Name'],
                         'namespace': record.get('NamespacePrefix'),
@@ -241,65 +361,43 @@ class PDFViewerReverseEngineer:
             """
             
             try:
-                aura_result = self.sf.query(aura_query)
+                aura_records = list(self.sf.query_all_iter(aura_query))
+                
+                # One IN-query per chunk of bundles instead of a query per bundle
+                defs_by_bundle = self._fetch_aura_definitions([r['Id'] for r in aura_records])
+                add_component = components_analysis['lightning_components'].append
                 
-                for record in aura_result['records']:
+                for record in aura_records:
                     component_id = record['Id']
                     
-                    # Get component definitions
-                    definition_query = f"""
-                        SELECT Id, DefType, Format, Source
-                        FROM AuraDefinition
-                        WHERE AuraDefinitionBundleId = '{component_id}'
-                    """
-                    
                     definitions = []
                     javascript_code = []
                     url_patterns = []
                     rest_calls = []
                     
-                    try:
-                        def_result = self.sf.query(definition_query)
+                    for def_record in defs_by_bundle.get(component_id, []):
+                        source = def_record.get('Source') or ''
+                        def_type = def_record.get('DefType')
                         
-                        for def_record in def_result['records']:
-                            source = def_record.get('Source', '')
-                            def_type = def_record.get('DefType')
-                            
-                            definitions.append({
+                        definitions.append({
+                            'type': def_type,
+                            'format': def_record.get('Format'),
+                            'source_length': len(source)
+                        })
+                        
+                        if def_type in _AURA_JS_DEF_TYPES and source:
+                            javascript_code.append({
                                 'type': def_type,
-                                'format': def_record.get('Format'),
-                                'source_length': len(source)
+                                'code': source
                             })
                             
-                            if def_type in ['CONTROLLER', 'HELPER'] and source:
-                                javascript_code.append({
-                                    'type': def_type,
-                                    'code': source
-                                })
-                                
-                                # Extract URL patterns from JS
-                                import re
-                                url_matches = re.findall(r'https?://[^\s"\'<>]+', source)
-                                for url in url_matches:
-                                    if 'amazonaws' in url or 'trackland' in url or 's3' in url:
-                                        url_patterns.append(url)
-                                
-                                # Look for REST calls in JS
-                                rest_patterns = [
-                                    r'/services/apexrest/[^\s"\'<>]+',
-                                    r'callout:[^\s"\'<>]+',
-                                    r'\$A\.enqueueAction',
-                                    r'action\.setCallback'
-                                ]
-                                
-                                for pattern in rest_patterns:
-                                    rest_matches = re.findall(pattern, source, re.IGNORECASE)
-                                    rest_calls.extend(rest_matches)
-                    
-                    except Exception as def_error:
-                        self.logger.debug(f"Could not get definitions for {record['DeveloperName']}: {def_error}")
+                            # Extract URL patterns from JS
+                            url_patterns.extend(_RE_S3_URL.findall(source))
+                            
+                            # Look for REST calls in JS
+                            rest_calls.extend(_RE_AURA_REST_CALLS.findall(source))
                     
-                    components_analysis['lightning_components'].append({
+                    add_component({
                         'id': record['Id'],
                         'developer_name': record['DeveloperName'],
                         'namespace': record.get('NamespacePrefix'),
@@ -321,6 +419,34 @@ class PDFViewerReverseEngineer:
             self.logger.error(f"❌ Error examining PDF viewer components: {e}")
             return {}
     
+    def _fetch_aura_definitions(self, bundle_ids: List[str]) -> Dict[str, List[Dict]]:
+        """Fetch AuraDefinitions for many bundles, grouped by bundle ID."""
+        defs_by_bundle: Dict[str, List[Dict]] = defaultdict(list)
+        
+        for start in range(0, len(bundle_ids), SOQL_ID_BATCH_SIZE):
+            chunk = bundle_ids[start:start + SOQL_ID_BATCH_SIZE]
+            # IDs are quoted/escaped by format_soql rather than spliced in by hand
+            definition_query = format_soql(
+                """
+                SELECT Id, DefType, Format, Source, AuraDefinitionBundleId
+                FROM AuraDefinition
+                WHERE AuraDefinitionBundleId IN {ids}
+                AND (Source LIKE '%amazonaws%' OR Source LIKE '%/services/apexrest%'
+                   OR Source LIKE '%$A.enqueueAction%' OR Source LIKE '%callout:%')
+                """,
+                ids=chunk
+            )
+            
+            try:
+                for def_record in self.sf.query_all_iter(definition_query):
+                    source = def_record.get('Source')
+                    if source and source != HIDDEN_SOURCE:
+                        defs_by_bundle[def_record['AuraDefinitionBundleId']].append(def_record)
+            except Exception as def_error:
+                self.logger.debug(f"Could not get definitions for {len(chunk)} bundles: {def_error}")
+        
+        return defs_by_bundle
+    
     def test_potential_proxy_endpoints(self, sample_doclist_entries: List[str]) -> List[Dict]:
         """Test potential proxy endpoints with sample DocListEntry IDs."""
         try:
@@ -339,50 +465,25 @@ class PDFViewerReverseEngineer:
                 '/services/apexrest/tlnd/pdf/'
             ]
             
-            test_results = []
+            base_url = self.sf.base_url.rstrip('/')
+            sample_ids = sample_doclist_entries[:2]  # Test with 2 sample IDs
             
-            for endpoint_pattern in potential_endpoints:
-                for doclist_id in sample_doclist_entries[:2]:  # Test with 2 sample IDs
-                    
-                    # Try different URL constructions
-                    test_urls = [
-                        f"{self.sf.base_url.rstrip('/')}{endpoint_pattern}{doclist_id}",
-                        f"{self.sf.base_url.rstrip('/')}{endpoint_pattern}?id={doclist_id}",
-                        f"{self.sf.base_url.rstrip('/')}{endpoint_pattern}?doclistentry={doclist_id}"
-                    ]
-                    
-                    for test_url in test_urls:
-                        try:
-                            self.logger.debug(f"Testing: {test_url}")
-                            
-                            headers = {
-                                'Authorization': f'Bearer {self.sf.session_id}',
-                                'Content-Type': 'application/json'
-                            }
-                            
-                            response = requests.get(test_url, headers=headers, timeout=10)
-                            
-                            test_results.append({
-                                'endpoint_pattern': endpoint_pattern,
-                                'test_url': test_url,
-                                'doclist_id': doclist_id,
-                                'status_code': response.status_code,
-                                'content_type': response.headers.get('Content-Type'),
-                                'content_length': len(response.content) if response.content else 0,
-                                'response_preview': response.text[:200] + "..." if response.text and len(response.text) > 200 else response.text[:200]
-                            })
-                            
-                            # If we get a successful response, this might be a working endpoint
-                            if response.status_code == 200 and response.content:
-                                self.logger.info(f"✅ Potential working endpoint: {test_url}")
-                            
-                        except Exception as e:
-                            test_results.append({
-                                'endpoint_pattern': endpoint_pattern,
-                                'test_url': test_url,
-                                'doclist_id': doclist_id,
-                                'error': str(e)
-                            })
+            # Try different URL constructions for every endpoint/ID pair
+            probes = [
+                (endpoint_pattern, doclist_id, test_url)
+                for endpoint_pattern in potential_endpoints
+                for doclist_id in sample_ids
+                for test_url in (
+                    f"{base_url}{endpoint_pattern}{doclist_id}",
+                    f"{base_url}{endpoint_pattern}?id={doclist_id}",
+                    f"{base_url}{endpoint_pattern}?doclistentry={doclist_id}"
+                )
+            ]
+            
+            # Probes are independent and latency-bound; run them concurrently
+            # over the pooled session (map keeps results in probe order).
+            with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+                test_results = list(executor.map(lambda probe: self._probe(*probe), probes))
             
             return test_results
             
@@ -390,6 +491,40 @@ class PDFViewerReverseEngineer:
             self.logger.error(f"❌ Error testing proxy endpoints: {e}")
             return []
     
+    def _probe(self, endpoint_pattern: str, doclist_id: str, test_url: str) -> Dict:
+        """Issue a single proxy endpoint probe and summarize the response."""
+        try:
+            self.logger.debug(f"Testing: {test_url}")
+            
+            headers = {'Authorization': f'Bearer {self.sf.session_id}'}
+            # Stream so a hit that returns a whole PDF only costs the first few KB
+            with self.http.get(test_url, headers=headers, timeout=10, stream=True) as response:
+                head = response.raw.read(PROBE_READ_BYTES, decode_content=True) or b''
+                content_length = int(response.headers.get('Content-Length') or 0) or len(head)
+                text = head.decode(response.encoding or 'utf-8', errors='replace')
+                
+                # If we get a successful response, this might be a working endpoint
+                if response.status_code == 200 and head:
+                    self.logger.info(f"✅ Potential working endpoint: {test_url}")
+                
+                return {
+                    'endpoint_pattern': endpoint_pattern,
+                    'test_url': test_url,
+                    'doclist_id': doclist_id,
+                    'status_code': response.status_code,
+                    'content_type': response.headers.get('Content-Type'),
+                    'content_length': content_length,
+                    'response_preview': text[:200] + ("..." if len(text) > 200 else "")
+                }
+            
+        except Exception as e:
+            return {
+                'endpoint_pattern': endpoint_pattern,
+                'test_url': test_url,
+                'doclist_id': doclist_id,
+                'error': str(e)
+            }
+    
     def comprehensive_reverse_engineering(self) -> Dict:
         """Perform comprehensive reverse engineering of the PDF viewer system."""
         self.logger.info("🔍 Starting comprehensive PDF viewer reverse engineering...")
@@ -430,30 +565,52 @@ class PDFViewerReverseEngineer:
         
         return analysis_results
     
+    def save_analysis_to_file(self, analysis: Dict, filename: Optional[str] = None) -> Optional[str]:
+        """Save analysis results to JSON file."""
+        if not filename:
+            # Reuse the analysis timestamp rather than reading the clock again
+            timestamp = datetime.fromisoformat(analysis['analysis_timestamp']).strftime("%Y%m%d_%H%M%S")
+            filename = f"pdf_viewer_analysis_{timestamp}.json"
+        
+        try:
+            with open(filename, 'wb') as f:
+                f.write(_json_dump_bytes(analysis))
+            
+            self.logger.info(f"💾 Analysis saved to: {os.path.abspath(filename)}")
+            return filename
+            
+        except Exception as e:
+            self.logger.error(f"❌ Failed to save analysis: {e}")
+            return None
+    
     def print_analysis_results(self, analysis: Dict):
         """Print formatted reverse engineering analysis results."""
-        print("\n" + "=" * 80)
-        print("PDF VIEWER REVERSE ENGINEERING ANALYSIS")
-        print("=" * 80)
+        # Lines are collected and written once rather than print()ed one by one
+        out: List[str] = []
+        emit = out.append
+        
+        emit("\n" + "=" * 80)
+        emit("PDF VIEWER REVERSE ENGINEERING ANALYSIS")
+        emit("=" * 80)
         
         # REST Endpoints
         rest_endpoints = analysis.get('rest_endpoints', [])
         relevant_endpoints = [e for e in rest_endpoints if e['file_relevance'] > 0]
         
-        print(f"\n🌐 REST ENDPOINTS: {len(rest_endpoints)} total, {len(relevant_endpoints)} file-relevant")
-        print("-" * 50)
+        emit(f"\n🌐 REST ENDPOINTS: {len(rest_endpoints)} total, {len(relevant_endpoints)} file-relevant")
+        emit("-" * 50)
         
         for endpoint in relevant_endpoints[:5]:  # Top 5 most relevant
-            print(f"🔥 {endpoint['name']}")
+            emit(f"🔥 {endpoint['name']}")
             if endpoint.get('namespace'):
-                print(f"   Namespace: {endpoint['namespace']}")
+                emit(f"   Namespace: {endpoint['namespace']}")
             if endpoint.get('url_pattern'):
-                print(f"   URL Pattern: {endpoint['url_pattern']}")
-            print(f"   Methods: {', '.join(endpoint.get('methods', []))}")
-            print(f"   File Relevance: {endpoint['file_relevance']}")
+                emit(f"   URL Pattern: {endpoint['url_pattern']}")
+            emit(f"   Methods: {', '.join(endpoint.get('methods', []))}")
+            emit(f"   File Relevance: {endpoint['file_relevance']}")
             if endpoint.get('method_signatures'):
-                print(f"   Method Signatures: {', '.join(endpoint['method_signatures'])}")
-            print()
+                emit(f"   Method Signatures: {', '.join(endpoint['method_signatures'])}")
+            emit('')
         
         # PDF Viewer Components
         components = analysis.get('pdf_viewer_components', {})
@@ -461,93 +618,95 @@ class PDFViewerReverseEngineer:
         # Visualforce Pages
         vf_pages = components.get('visualforce_pages', [])
         if vf_pages:
-            print(f"\n📄 VISUALFORCE PDF VIEWERS: {len(vf_pages)} found")
-            print("-" * 50)
+            emit(f"\n📄 VISUALFORCE PDF VIEWERS: {len(vf_pages)} found")
+            emit("-" * 50)
             
             for page in vf_pages:
-                print(f"🔍 {page['name']}")
+                emit(f"🔍 {page['name']}")
                 if page.get('namespace'):
-                    print(f"   Namespace: {page['namespace']}")
+                    emit(f"   Namespace: {page['namespace']}")
                 if page.get('master_label'):
-                    print(f"   Label: {page['master_label']}")
+                    emit(f"   Label: {page['master_label']}")
                 
                 if page.get('javascript_blocks', 0) > 0:
-                    print(f"   JavaScript Blocks: {page['javascript_blocks']}")
+                    emit(f"   JavaScript Blocks: {page['javascript_blocks']}")
                 
                 if page.get('iframe_sources'):
-                    print(f"   Iframe Sources: {page['iframe_sources']}")
+                    emit(f"   Iframe Sources: {page['iframe_sources']}")
                 
                 if page.get('url_patterns'):
-                    print(f"   S3/External URLs Found:")
+                    emit(f"   S3/External URLs Found:")
                     for url in page['url_patterns']:
-                        print(f"     • {url}")
+                        emit(f"     • {url}")
                 
                 if page.get('rest_calls'):
-                    print(f"   REST Calls Found:")
+                    emit(f"   REST Calls Found:")
                     for call in page['rest_calls']:
-                        print(f"     • {call}")
+                        emit(f"     • {call}")
                 
                 # Show JavaScript code if it contains relevant patterns
                 if page.get('javascript_code'):
                     for js_block in page['javascript_code']:
-                        if any(keyword in js_block.lower() for keyword in ['url', 'endpoint', 'document', 'file']):
-                            print(f"   JavaScript Preview:")
-                            print(f"     {js_block[:300]}...")
+                        js_lower = js_block.lower()
+                        if any(keyword in js_lower for keyword in _VF_JS_PREVIEW_KEYWORDS):
+                            emit(f"   JavaScript Preview:")
+                            emit(f"     {js_block[:300]}...")
                             break
-                print()
+                emit('')
         
         # Lightning Components
         lightning_components = components.get('lightning_components', [])
         if lightning_components:
-            print(f"\n⚡ LIGHTNING PDF VIEWERS: {len(lightning_components)} found")
-            print("-" * 50)
+            emit(f"\n⚡ LIGHTNING PDF VIEWERS: {len(lightning_components)} found")
+            emit("-" * 50)
             
             for comp in lightning_components:
-                print(f"🔍 {comp['developer_name']}")
+                emit(f"🔍 {comp['developer_name']}")
                 if comp.get('namespace'):
-                    print(f"   Namespace: {comp['namespace']}")
+                    emit(f"   Namespace: {comp['namespace']}")
                 if comp.get('description'):
-                    print(f"   Description: {comp['description']}")
+                    emit(f"   Description: {comp['description']}")
                 
                 if comp.get('url_patterns'):
-                    print(f"   S3/External URLs Found:")
+                    emit(f"   S3/External URLs Found:")
                     for url in comp['url_patterns']:
-                        print(f"     • {url}")
+                        emit(f"     • {url}")
                 
                 if comp.get('rest_calls'):
-                    print(f"   REST Calls Found:")
+                    emit(f"   REST Calls Found:")
                     for call in comp['rest_calls']:
-                        print(f"     • {call}")
+                        emit(f"     • {call}")
                 
                 if comp.get('javascript_code'):
                     for js in comp['javascript_code']:
-                        if any(keyword in js['code'].lower() for keyword in ['url', 'endpoint', 'document']):
-                            print(f"   {js['type']} JavaScript Preview:")
-                            print(f"     {js['code'][:300]}...")
-                print()
+                        js_lower = js['code'].lower()
+                        if any(keyword in js_lower for keyword in _AURA_JS_PREVIEW_KEYWORDS):
+                            emit(f"   {js['type']} JavaScript Preview:")
+                            emit(f"     {js['code'][:300]}...")
+                emit('')
         
         # Proxy Endpoint Tests
         proxy_tests = analysis.get('proxy_endpoint_tests', [])
         successful_tests = [t for t in proxy_tests if t.get('status_code') == 200 and t.get('content_length', 0) > 100]
         
-        print(f"\n🔍 PROXY ENDPOINT TESTS: {len(proxy_tests)} tested, {len(successful_tests)} successful")
-        print("-" * 50)
+        emit(f"\n🔍 PROXY ENDPOINT TESTS: {len(proxy_tests)} tested, {len(successful_tests)} successful")
+        emit("-" * 50)
         
         if successful_tests:
-            print("✅ WORKING ENDPOINTS FOUND:")
+            emit("✅ WORKING ENDPOINTS FOUND:")
             for test in successful_tests[:3]:
-                print(f"   • {test['test_url']}")
-                print(f"     Status: {test['status_code']}, Type: {test.get('content_type')}, Size: {test.get('content_length')}")
+                emit(f"   • {test['test_url']}")
+                emit(f"     Status: {test['status_code']}, Type: {test.get('content_type')}, Size: {test.get('content_length')}")
                 if test.get('response_preview'):
-                    print(f"     Response: {test['response_preview']}")
-                print()
+                    emit(f"     Response: {test['response_preview']}")
+                emit('')
         else:
-            print("❌ No working proxy endpoints found in standard patterns")
+            emit("❌ No working proxy endpoints found in standard patterns")
         
         # Final Strategy Recommendations
-        print("\n" + "=" * 80)
-        print("🎯 REVERSE ENGINEERING CONCLUSIONS & NEXT STEPS")
-        print("=" * 80)
+        emit("\n" + "=" * 80)
+        emit("🎯 REVERSE ENGINEERING CONCLUSIONS & NEXT STEPS")
+        emit("=" * 80)
         
         recommendations = []
         
@@ -585,9 +744,12 @@ class PDFViewerReverseEngineer:
             recommendations.append("💡 May need to examine page source when PDF viewer loads")
         
         for rec in recommendations:
-            print(rec)
+            emit(rec)
+        
+        emit("=" * 80)
         
-        print("=" * 80)
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
 
 
 def main():
@@ -606,6 +768,7 @@ def main():
         
         analysis = engineer.comprehensive_reverse_engineering()
         engineer.print_analysis_results(analysis)
+        engineer.save_analysis_to_file(analysis)
         
         return True
         
@@ -8,38 +8,130 @@ goes wrong during Phase 2 migration.
 
 Features:
 - Restore original external S3 URLs in Salesforce
-- Uses rollback data files or database records
+- Uses rollback data files (plain, .json.gz or .json.zst) or database records
 - Batch processing for performance
 - Comprehensive logging and verification
 
 ⚠️ WARNING: Use only in emergency situations!
 
 Usage:
-python rollback_migration.py --rollback-file rollback_data_20241201_143022.json
+python rollback_migration.py --rollback-file rollback_data_20241201_143022.json.gz
 python rollback_migration.py --from-database  # Use database records
 """
 
 import sys
 import argparse
+import gzip
 import json
 import logging
+import time
 import traceback
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+import requests
+from requests.adapters import HTTPAdapter
 from simple_salesforce import Salesforce
 from simple_salesforce.exceptions import SalesforceError
 
 from migration_db import MigrationDB
+from salesforce_client import RateLimiter, restore_cached_session, save_cached_session
+
+try:
+    # Optional: incremental JSON parser so large manifests aren't parsed as one document
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # Optional: reading .json.zst rollback manifests
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    # Optional: faster whole-document parsing when ijson isn't available
+    import orjson
+    
+    def _json_line(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    orjson = None
+    
+    def _json_line(obj) -> str:
+        return json.dumps(obj)
 
 # Import configuration
 try:
-    from config import SALESFORCE_CONFIG
+    from config import SALESFORCE_CONFIG, MIGRATION_CONFIG
     print("✓ Using configuration from config.py")
 except ImportError:
     print("❌ config.py not found. Please copy config_template.py to config.py and update it.")
     sys.exit(1)
 
+# Rows pulled per fetchmany() when loading rollback records from the database
+DB_FETCH_SIZE = 10000
+
+# Salesforce record IDs are 15 (case-sensitive) or 18 characters
+_VALID_SF_ID_LENGTHS = frozenset((15, 18))
+
+# IDs per sObject Collections retrieve (API maximum)
+LOOKUP_BATCH_SIZE = 2000
+
+# Rows reset per transaction when marking rolled-back files as backup-only
+DB_UPDATE_CHUNK_SIZE = 10000
+
+# Collections PATCHes bundled into one Composite API request. Composite allows
+# 25 subrequests but at most 5 sObject Collections/query ones (1000 records)
+COMPOSITE_COLLECTIONS_LIMIT = 5
+
+# sObject type marker shared by every record in a collections request
+_DOCLIST_ATTRIBUTES = {'type': 'DocListEntry__c'}
+
+# Attempts per Salesforce call when the org reports it is being throttled
+MAX_API_RETRIES = 5
+
+
+class RollbackRecord(NamedTuple):
+    """A validated rollback entry (a tuple is ~3x smaller than the source dict)."""
+    id: str
+    original_url: str
+    migrated_url: Optional[str] = None
+
+
+def _open_manifest(path: Path):
+    """Open a rollback manifest for binary reading, decompressing by file suffix."""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rb')
+    if path.suffix == '.zst':
+        if zstandard is None:
+            raise ImportError("Reading .zst rollback files requires `pip install zstandard`")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to ``size`` consecutive items without materialising the input."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _is_rate_limited(error: SalesforceError) -> bool:
+    """Whether Salesforce rejected a call for exceeding request limits."""
+    return error.status == 429 or 'REQUEST_LIMIT_EXCEEDED' in str(error.content)
+
+
+def _is_rate_limited_subresponse(subresponse: Dict) -> bool:
+    """Whether Salesforce throttled one subrequest of a Composite API call."""
+    status = subresponse['httpStatusCode']
+    return status == 429 or (status >= 400 and 'REQUEST_LIMIT_EXCEEDED' in str(subresponse['body']))
+
 
 class MigrationRollback:
     """Emergency rollback tool for migration."""
@@ -50,6 +142,13 @@ class MigrationRollback:
         self.logger = self._setup_logging()
         self.sf = None
         
+        # Concurrent update requests (Salesforce caps concurrent API calls per org)
+        self.max_workers = MIGRATION_CONFIG.get('max_concurrent_api_requests', 5)
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.http.mount('https://', adapter)
+        self.rate_limiter = RateLimiter(MIGRATION_CONFIG.get('api_requests_per_second', 10))
+        
         # Statistics
         self.stats = {
             'total_records': 0,
@@ -66,6 +165,8 @@ class MigrationRollback:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         mode = "dryrun" if self.dry_run else "execute"
         log_file = log_dir / f"rollback_{mode}_{timestamp}.log"
+        # Per-record From/To detail goes here (JSON lines) instead of the log
+        self.audit_file = log_dir / f"rollback_audit_{timestamp}.jsonl"
         
         logging.basicConfig(
             level=logging.INFO,
@@ -82,15 +183,21 @@ class MigrationRollback:
     
     def authenticate_salesforce(self) -> bool:
         """Authenticate with Salesforce."""
+        if self._restore_cached_session():
+            self.logger.info("✓ Reusing cached Salesforce session")
+            return True
+        
         try:
             self.logger.info("Authenticating with Salesforce...")
             self.sf = Salesforce(
                 username=SALESFORCE_CONFIG["username"],
                 password=SALESFORCE_CONFIG["password"],
                 security_token=SALESFORCE_CONFIG["security_token"],
-                domain=SALESFORCE_CONFIG["domain"]
+                domain=SALESFORCE_CONFIG["domain"],
+                session=self.http
             )
             self.logger.info("✓ Successfully authenticated with Salesforce")
+            self._save_cached_session()
             return True
         except SalesforceError as e:
             self.logger.error(f"❌ Salesforce authentication failed: {e}")
@@ -99,8 +206,29 @@ class MigrationRollback:
             self.logger.error(f"❌ Unexpected error during Salesforce authentication: {e}")
             return False
     
-    def load_rollback_data_from_file(self, rollback_file: str) -> List[Dict]:
-        """Load rollback data from JSON file."""
+    def _restore_cached_session(self) -> bool:
+        """Reuse a still-valid session from a previous run instead of logging in again."""
+        sf = restore_cached_session(
+            SALESFORCE_CONFIG["username"],
+            MIGRATION_CONFIG.get('session_cache_ttl_seconds', 3600),
+            session=self.http
+        )
+        if sf is None:
+            return False
+        self.sf = sf
+        return True
+    
+    def _save_cached_session(self):
+        """Store the current session so the next run can skip authentication."""
+        save_cached_session(self.sf, SALESFORCE_CONFIG["username"],
+                            MIGRATION_CONFIG.get('session_cache_ttl_seconds', 3600))
+    
+    def load_rollback_data_from_file(self, rollback_file: str) -> Iterator[Dict]:
+        """Load rollback data from JSON file.
+        
+        Records are returned lazily and parsed as verify_rollback_data
+        consumes them, so the manifest is never held as a list of dicts.
+        """
         try:
             self.logger.info(f"Loading rollback data from {rollback_file}")
             
@@ -108,38 +236,49 @@ class MigrationRollback:
             if not rollback_path.exists():
                 raise FileNotFoundError(f"Rollback file not found: {rollback_file}")
             
-            with open(rollback_path, 'r') as f:
-                data = json.load(f)
-            
-            records = data.get('records', [])
-            self.logger.info(f"Loaded {len(records)} rollback records from file")
-            
-            return records
+            return self.iter_rollback_records(rollback_path)
             
         except Exception as e:
             self.logger.error(f"Failed to load rollback data from file: {e}")
             raise
     
+    def iter_rollback_records(self, rollback_path: Path) -> Iterator[Dict]:
+        """Yield the records of a rollback file one at a time.
+        
+        ``.gz`` and ``.zst`` manifests are decompressed as they are parsed.
+        """
+        with _open_manifest(rollback_path) as f:
+            if ijson is not None:
+                yield from ijson.items(f, 'records.item')
+            elif orjson is not None:
+                yield from orjson.loads(f.read()).get('records', [])
+            else:
+                yield from json.load(f).get('records', [])
+    
     def load_rollback_data_from_database(self) -> List[Dict]:
         """Load rollback data from migration database."""
         try:
             self.logger.info("Loading rollback data from database")
             
             with MigrationDB() as db:
+                # Plain tuples: positional access skips sqlite3.Row name lookups
+                cursor = db.conn.cursor()
+                cursor.row_factory = None
+                
                 # Get all files that have been fully migrated (salesforce_updated = 1)
-                migrated_files = db.conn.execute('''
-                    SELECT doclist_entry_id, original_url
+                cursor.execute('''
+                    SELECT doclist_entry_id, original_url, your_s3_url
                     FROM file_migrations
                     WHERE salesforce_updated = 1
                     ORDER BY updated_date DESC
-                ''').fetchall()
+                ''')
                 
                 records = []
-                for file_record in migrated_files:
-                    records.append({
-                        'Id': file_record['doclist_entry_id'],
-                        'original_url': file_record['original_url']
-                    })
+                while True:
+                    rows = cursor.fetchmany(DB_FETCH_SIZE)
+                    if not rows:
+                        break
+                    records.extend({'Id': row[0], 'original_url': row[1], 'migrated_url': row[2]} for row in rows)
                 
                 self.logger.info(f"Loaded {len(records)} rollback records from database")
                 return records
@@ -148,38 +287,40 @@ class MigrationRollback:
             self.logger.error(f"Failed to load rollback data from database: {e}")
             raise
     
-    def verify_rollback_data(self, records: List[Dict]) -> List[Dict]:
-        """Verify rollback data and filter valid records."""
+    def verify_rollback_data(self, records: Iterable[Dict]) -> List[RollbackRecord]:
+        """Verify rollback data and filter valid records.
+        
+        ``records`` is consumed in a single pass, so it may be a lazy
+        iterator; only the compact RollbackRecord tuples are kept.
+        """
         try:
-            self.logger.info(f"Verifying {len(records)} rollback records")
+            self.logger.info("Verifying rollback records")
             
+            # Required fields, Salesforce ID format (15 or 18 characters), URL format.
+            # The ID lengths are bound locally and the scheme is checked with a slice
+            # compare, which is cheaper per record than a startswith() method call.
+            valid_lengths = _VALID_SF_ID_LENGTHS
+            debug = self.logger.debug if self.logger.isEnabledFor(logging.DEBUG) else None
             valid_records = []
-            invalid_count = 0
+            append = valid_records.append
+            total_count = 0
             
             for record in records:
-                # Check required fields
-                if not record.get('Id') or not record.get('original_url'):
-                    self.logger.warning(f"Invalid rollback record: missing Id or original_url")
-                    invalid_count += 1
-                    continue
-                
-                # Validate Salesforce ID format (15 or 18 characters)
-                sf_id = record['Id']
-                if len(sf_id) not in [15, 18]:
-                    self.logger.warning(f"Invalid Salesforce ID format: {sf_id}")
-                    invalid_count += 1
-                    continue
-                
-                # Validate URL format
-                original_url = record['original_url']
-                if not original_url.startswith('http'):
-                    self.logger.warning(f"Invalid URL format: {original_url}")
-                    invalid_count += 1
-                    continue
-                
-                valid_records.append(record)
+                total_count += 1
+                if ((sf_id := record.get('Id')) and (original_url := record.get('original_url'))
+                        and len(sf_id) in valid_lengths and original_url[:4] == 'http'):
+                    append(RollbackRecord(sf_id, original_url, record.get('migrated_url')))
+                elif debug:
+                    debug(f"Invalid rollback record: {record}")
+            
+            invalid_count = total_count - len(valid_records)
             
-            self.logger.info(f"Verification complete: {len(valid_records)} valid, {invalid_count} invalid")
+            if not total_count:
+                self.logger.info("No rollback records found. Nothing to rollback.")
+            elif not valid_records:
+                self.logger.error("No valid rollback records found.")
+            else:
+                self.logger.info(f"Verification complete: {len(valid_records)} valid, {invalid_count} invalid")
             return valid_records
             
         except Exception as e:
@@ -191,24 +332,14 @@ class MigrationRollback:
         try:
             self.logger.info(f"Fetching current Salesforce data for {len(record_ids)} records")
             
-            # Split into batches to avoid query limits
-            batch_size = 200
+            # Batches are independent reads; fetch them concurrently
             all_records = {}
+            batches = [record_ids[i:i + LOOKUP_BATCH_SIZE] for i in range(0, len(record_ids), LOOKUP_BATCH_SIZE)]
             
-            for i in range(0, len(record_ids), batch_size):
-                batch_ids = record_ids[i:i + batch_size]
-                ids_string = "','".join(batch_ids)
-                
-                query = f"""
-                    SELECT Id, Document__c 
-                    FROM DocListEntry__c 
-                    WHERE Id IN ('{ids_string}')
-                """
-                
-                result = self.sf.query(query)
-                
-                for record in result['records']:
-                    all_records[record['Id']] = record
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(self._lookup_batch, batch_ids) for batch_ids in batches]
+                for future in as_completed(futures):
+                    all_records.update(future.result())
             
             self.logger.info(f"Retrieved {len(all_records)} current Salesforce records")
             return all_records
@@ -220,97 +351,244 @@ class MigrationRollback:
             self.logger.error(f"Unexpected error querying Salesforce: {e}")
             raise
     
-    def perform_rollback(self, rollback_records: List[Dict]) -> bool:
+    def _lookup_batch(self, batch_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch current Document__c for up to 2000 DocListEntry IDs."""
+        # sObject Collections retrieve takes IDs in the request body
+        # (no SOQL to build or parse)
+        records = self._api_call(
+            self.sf.restful, 'composite/sobjects/DocListEntry__c', method='POST',
+            json={'ids': batch_ids, 'fields': ['Id', 'Document__c']}
+        )
+        
+        # Results are positional (None for missing records), so key by the
+        # requested ID; this also matches 15-character manifest IDs
+        return {record_id: record for record_id, record in zip(batch_ids, records) if record}
+    
+    def perform_rollback(self, rollback_records: List[RollbackRecord]) -> bool:
         """Perform the actual rollback operation."""
         try:
             self.logger.info(f"Starting rollback for {len(rollback_records)} records")
             
-            # Get current Salesforce data for comparison
-            record_ids = [r['Id'] for r in rollback_records]
-            current_sf_data = self.get_current_salesforce_data(record_ids)
+            if all(r.migrated_url is not None for r in rollback_records):
+                # The DB / newer manifests record the URL Phase 2 wrote, so the
+                # pre-flight lookup of current Salesforce values can be skipped
+                self.logger.info("Using recorded migrated URLs; skipping current Salesforce lookup")
+                current_sf_data = None
+            else:
+                # Get current Salesforce data for comparison
+                # Deduplicated (order-preserving) so repeated manifest entries don't cost query rows
+                record_ids = list(dict.fromkeys(r.id for r in rollback_records))
+                current_sf_data = self.get_current_salesforce_data(record_ids)
+            
+            # Batches are prepared lazily, so building the next batch overlaps
+            # with sending the previous ones
+            batches = self._prepare_batches(rollback_records, current_sf_data, len(rollback_records))
             
-            # Process records in batches
-            batch_size = 200  # Salesforce bulk API limit
-            total_batches = (len(rollback_records) + batch_size - 1) // batch_size
+            if self.dry_run:
+                for updates in batches:
+                    # Dry run - count as successful
+                    self.stats['successful_rollbacks'] += len(updates)
+            else:
+                self._execute_updates(batches)
             
-            for batch_num in range(total_batches):
-                start_idx = batch_num * batch_size
-                end_idx = min(start_idx + batch_size, len(rollback_records))
-                batch = rollback_records[start_idx:end_idx]
-                
-                self.logger.info(f"Processing rollback batch {batch_num + 1}/{total_batches} ({len(batch)} records)")
-                
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Rollback operation failed: {e}")
+            return False
+    
+    def _prepare_batches(self, rollback_records: Iterable[RollbackRecord],
+                         current_sf_data: Optional[Dict[str, Dict]],
+                         total_records: int) -> Iterator[List[Dict]]:
+        """Yield each batch's pending updates, skipping records needing no rollback.
+        
+        ``rollback_records`` is consumed lazily, one batch at a time;
+        ``total_records`` is only used for progress messages. Without
+        ``current_sf_data`` each record's ``migrated_url`` stands in for the
+        current Document__c value.
+        """
+        batch_size = 200  # sObject Collections limit
+        total_batches = (total_records + batch_size - 1) // batch_size
+        audit = None if self.dry_run else open(self.audit_file, 'a')
+        
+        # Loop invariants bound once; debug messages are only formatted when enabled
+        prefix = "[DRY RUN] " if self.dry_run else ""
+        debug = self.logger.debug if self.logger.isEnabledFor(logging.DEBUG) else None
+        
+        try:
+            for batch_num, batch in enumerate(_chunked(rollback_records, batch_size)):
                 # Prepare batch update data
                 updates = []
-                batch_stats = {'processed': 0, 'skipped': 0}
+                audit_lines = []
+                batch_stats = {'processed': 0, 'skipped': 0, 'missing': 0}
                 
-                for record in batch:
-                    record_id = record['Id']
-                    original_url = record['original_url']
-                    
-                    # Check if record exists in current Salesforce data
-                    current_record = current_sf_data.get(record_id)
-                    if not current_record:
-                        self.logger.warning(f"Record not found in Salesforce: {record_id}")
-                        batch_stats['skipped'] += 1
-                        continue
-                    
-                    current_url = current_record.get('Document__c')
+                for record_id, original_url, migrated_url in batch:
+                    if current_sf_data is None:
+                        current_url = migrated_url
+                    else:
+                        # Check if record exists in current Salesforce data
+                        current_record = current_sf_data.get(record_id)
+                        if not current_record:
+                            if debug:
+                                debug(f"Record not found in Salesforce: {record_id}")
+                            batch_stats['missing'] += 1
+                            batch_stats['skipped'] += 1
+                            continue
+                        
+                        current_url = current_record.get('Document__c')
                     
                     # Check if rollback is needed
                     if current_url == original_url:
-                        self.logger.debug(f"Record already has original URL, skipping: {record_id}")
+                        if debug:
+                            debug(f"Record already has original URL, skipping: {record_id}")
                         batch_stats['skipped'] += 1
                         continue
                     
-                    # Add to updates
+                    # Add to updates, already in the collections wire format
                     updates.append({
+                        'attributes': _DOCLIST_ATTRIBUTES,
                         'Id': record_id,
                         'Document__c': original_url
                     })
                     batch_stats['processed'] += 1
                     
-                    if not self.dry_run:
-                        self.logger.info(f"Rolling back {record_id}")
-                        self.logger.info(f"  From: {current_url}")
-                        self.logger.info(f"  To:   {original_url}")
-                    else:
-                        self.logger.info(f"[DRY RUN] Would rollback {record_id}")
+                    if audit is not None:
+                        audit_lines.append(_json_line({'Id': record_id, 'from': current_url, 'to': original_url}))
                 
-                # Execute batch update if not dry run
-                if updates and not self.dry_run:
-                    try:
-                        results = self.sf.bulk.DocListEntry__c.update(updates)
-                        
-                        # Process results
-                        for i, result in enumerate(results):
-                            if result['success']:
-                                self.stats['successful_rollbacks'] += 1
-                            else:
-                                self.logger.error(f"Failed to rollback {updates[i]['Id']}: {result['errors']}")
-                                self.stats['failed_rollbacks'] += 1
-                    
-                    except Exception as e:
-                        self.logger.error(f"Batch rollback failed: {e}")
-                        self.stats['failed_rollbacks'] += len(updates)
-                        continue
-                
-                elif updates:
-                    # Dry run - count as successful
-                    self.stats['successful_rollbacks'] += len(updates)
+                # One summary line per batch; per-record detail is in the audit file
+                self.logger.info(
+                    f"{prefix}Rollback batch {batch_num + 1}/{total_batches}: "
+                    f"{batch_stats['processed']} to roll back, {batch_stats['skipped']} skipped "
+                    f"({batch_stats['missing']} not found in Salesforce)"
+                )
+                if audit_lines:
+                    audit.write('\n'.join(audit_lines) + '\n')
                 
                 self.stats['skipped_records'] += batch_stats['skipped']
                 self.stats['total_records'] += batch_stats['processed'] + batch_stats['skipped']
                 
-                # Progress update
-                progress = (batch_num + 1) / total_batches * 100
-                self.logger.info(f"Rollback progress: {progress:.1f}%")
+                if updates:
+                    yield updates
+        finally:
+            if audit is not None:
+                audit.close()
+                self.logger.info(f"Rollback audit trail written to {self.audit_file}")
+    
+    def _patch_composite(self, batches: List[List[Dict]]) -> List[Dict]:
+        """Send up to 5 sObject Collections PATCHes (200 records each) in one Composite API request.
+        
+        Subrequests Salesforce throttles are sent again, with backoff, until
+        they go through or MAX_API_RETRIES is reached. Returns one subresponse
+        per batch, in order.
+        """
+        subresponses = [None] * len(batches)
+        pending = list(range(len(batches)))
+        for attempt in range(MAX_API_RETRIES):
+            throttled = []
+            for i, subresponse in zip(pending, self._post_composite(batches, pending)):
+                subresponses[i] = subresponse
+                if _is_rate_limited_subresponse(subresponse):
+                    throttled.append(i)
             
-            return True
+            if not throttled or attempt == MAX_API_RETRIES - 1:
+                break
+            delay = 2 ** attempt
+            self.logger.warning(f"Salesforce throttled {len(throttled)} rollback batches, retrying in {delay}s")
+            time.sleep(delay)
+            pending = throttled
+        
+        return subresponses
+    
+    def _post_composite(self, batches: List[List[Dict]], indexes: List[int]) -> List[Dict]:
+        """POST the batches at ``indexes`` as one Composite API request."""
+        url = f"/services/data/v{self.sf.sf_version}/composite/sobjects"
+        body = {
+            'allOrNone': False,
+            'compositeRequest': [
+                {
+                    'method': 'PATCH',
+                    'url': url,
+                    'referenceId': f"b{i}",
+                    'body': {'allOrNone': False, 'records': batches[i]}
+                }
+                for i in indexes
+            ]
+        }
+        if orjson is not None:
+            # Serialise once in C rather than via requests' stdlib json encoder
+            response = self._api_call(self.sf.restful, 'composite', method='POST', data=orjson.dumps(body))
+        else:
+            response = self._api_call(self.sf.restful, 'composite', method='POST', json=body)
+        return response['compositeResponse']
+    
+    def _api_call(self, func, *args, **kwargs):
+        """Make a rate-limited Salesforce call, backing off and retrying when throttled."""
+        for attempt in range(MAX_API_RETRIES):
+            self.rate_limiter.acquire()
+            try:
+                return func(*args, **kwargs)
+            except SalesforceError as e:
+                if not _is_rate_limited(e) or attempt == MAX_API_RETRIES - 1:
+                    raise
+                delay = 2 ** attempt
+                self.logger.warning(f"Salesforce request limit exceeded, retrying in {delay}s")
+                time.sleep(delay)
+    
+    def _execute_updates(self, batches: Iterable[List[Dict]]):
+        """Send update batches concurrently and record per-record results."""
+        # Backpressure: preparation may run at most a couple of requests ahead
+        # of the workers instead of queueing the whole rollback in memory
+        max_in_flight = self.max_workers * 2
+        futures = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for group in _chunked(batches, COMPOSITE_COLLECTIONS_LIMIT):
+                if len(futures) >= max_in_flight:
+                    self._tally_finished(futures, FIRST_COMPLETED)
+                futures[executor.submit(self._patch_composite, group)] = group
             
-        except Exception as e:
-            self.logger.error(f"Rollback operation failed: {e}")
-            return False
+            self._tally_finished(futures, ALL_COMPLETED)
+    
+    def _tally_finished(self, futures: Dict, return_when: str):
+        """Wait for in-flight requests, then tally and drop the finished ones.
+        
+        Finished futures are popped so their prepared batches can be freed.
+        Results are tallied here on the main thread, so stats need no lock.
+        """
+        done, _ = wait(futures, return_when=return_when)
+        for future in done:
+            group = futures.pop(future)
+            try:
+                subresponses = future.result()
+                
+                for updates, subresponse in zip(group, subresponses):
+                    self._tally_batch_results(updates, subresponse)
+            
+            except Exception as e:
+                self.logger.error(f"Batch rollback failed: {e}")
+                self.stats['failed_rollbacks'] += sum(len(updates) for updates in group)
+        
+        # Progress update
+        self.logger.info(
+            f"Rollback progress: {self.stats['successful_rollbacks']} rolled back, "
+            f"{self.stats['failed_rollbacks']} failed"
+        )
+    
+    def _tally_batch_results(self, updates: List[Dict], subresponse: Dict):
+        """Count per-record outcomes of one Composite subrequest."""
+        results = subresponse['body']
+        if subresponse['httpStatusCode'] >= 400:
+            # The whole collections PATCH was rejected; body holds the errors
+            self.logger.error(f"Batch rollback failed ({subresponse['referenceId']}): {results}")
+            self.stats['failed_rollbacks'] += len(updates)
+            return
+        
+        for update, result in zip(updates, results):
+            if result['success']:
+                self.stats['successful_rollbacks'] += 1
+            else:
+                self.logger.error(f"Failed to rollback {update['Id']}: {result['errors']}")
+                self.stats['failed_rollbacks'] += 1
     
     def update_database_after_rollback(self) -> bool:
         """Update migration database to reflect rollback."""
@@ -321,15 +599,29 @@ class MigrationRollback:
             self.logger.info("Updating migration database after rollback")
             
             with MigrationDB() as db:
-                # Mark all fully migrated files as backup-only
-                cursor = db.conn.execute('''
-                    UPDATE file_migrations 
-                    SET salesforce_updated = 0, migration_phase = 1, updated_date = ?
-                    WHERE salesforce_updated = 1
-                ''', (datetime.now().isoformat(),))
+                # WAL (set by MigrationDB) makes NORMAL sync durable enough per chunk
+                db.conn.execute('PRAGMA synchronous = NORMAL')
+                now_iso = datetime.now().isoformat()
+                updated_count = 0
                 
-                updated_count = cursor.rowcount
-                db.conn.commit()
+                # Mark all fully migrated files as backup-only, one short write
+                # transaction per chunk so readers aren't blocked and the WAL
+                # stays small
+                while True:
+                    with db.transaction():
+                        cursor = db.conn.execute('''
+                            UPDATE file_migrations
+                            SET salesforce_updated = 0, migration_phase = 1, updated_date = ?
+                            WHERE rowid IN (
+                                SELECT rowid FROM file_migrations
+                                WHERE salesforce_updated = 1
+                                LIMIT ?
+                            )
+                        ''', (now_iso, DB_UPDATE_CHUNK_SIZE))
+                    
+                    if cursor.rowcount == 0:
+                        break
+                    updated_count += cursor.rowcount
                 
                 self.logger.info(f"Updated {updated_count} database records to backup-only status")
                 return True
@@ -369,15 +661,10 @@ class MigrationRollback:
             else:
                 raise Exception("Invalid rollback source specified")
             
-            if not rollback_records:
-                self.logger.info("No rollback records found. Nothing to rollback.")
-                return
-            
-            # Verify rollback data
+            # Verify rollback data (logs why when there is nothing to roll back)
             valid_records = self.verify_rollback_data(rollback_records)
             
             if not valid_records:
-                self.logger.error("No valid rollback records found.")
                 return
             
             # Perform rollback
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Salesforce Client Helpers
+=========================
+
+Pieces shared by the scripts that talk to the Salesforce API: the cached
+login session (so repeat runs skip authentication) and the token-bucket
+rate limiter for API calls.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from simple_salesforce import Salesforce
+
+logger = logging.getLogger(__name__)
+
+# Where the last Salesforce session is kept so repeat runs can skip the login round-trip
+SESSION_CACHE_FILE = Path.home() / '.cache' / 'incite_migration' / 'sf_session.json'
+
+
+def restore_cached_session(username: str, ttl: float, session=None) -> Optional[Salesforce]:
+    """Reuse a still-valid session from a previous run instead of logging in again.
+
+    Returns None when there is no cached session for ``username`` younger
+    than ``ttl`` seconds, or when Salesforce rejects it. ``ttl <= 0``
+    disables the cache.
+    """
+    if ttl <= 0:
+        return None
+    try:
+        with open(SESSION_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cached.get('username') != username or time.time() - cached.get('ts', 0) > ttl:
+        return None
+
+    try:
+        sf = Salesforce(instance=cached['instance'], session_id=cached['session_id'], session=session)
+        # Cheapest authenticated call: lists the REST resources for this API version
+        sf.restful('')
+    except Exception as e:
+        logger.debug(f"Cached Salesforce session rejected, logging in again: {e}")
+        return None
+
+    return sf
+
+
+def save_cached_session(sf: Salesforce, username: str, ttl: float):
+    """Store the current session so the next run can skip authentication."""
+    if ttl <= 0:
+        return
+    try:
+        SESSION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        # The session ID is a bearer token: keep the file readable by this user only
+        fd = os.open(SESSION_CACHE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'username': username,
+                'instance': sf.sf_instance,
+                'session_id': sf.session_id,
+                'ts': time.time()
+            }, f)
+    except OSError as e:
+        logger.debug(f"Could not cache Salesforce session: {e}")
+
+
+class RateLimiter:
+    """Thread-safe token bucket capping Salesforce API calls per second.
+
+    A rate of 0 or less disables the limit.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call may be made."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
@@ -14,19 +14,36 @@ Usage:
 2. Run: python salesforce_s3_migration.py
 """
 
+import csv
+import io
 import os
+import random
+import re
 import sys
 import logging
+import threading
+import time
 import traceback
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from pathlib import Path, PurePosixPath
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, NoCredentialsError
-from simple_salesforce import Salesforce
+from botocore.exceptions import ConnectionError as BotoConnectionError
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from simple_salesforce import Salesforce, format_soql
 from simple_salesforce.exceptions import SalesforceError
-from urllib.parse import urlparse
+from urllib.parse import unquote, urlparse
+
+from salesforce_client import RateLimiter
 
 
 # =============================================================================
@@ -53,6 +70,9 @@ DEFAULT_MIGRATION_CONFIG = {
     "max_file_size_mb": 100,  # Skip files larger than this
     "allowed_extensions": ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.jpg', '.jpeg', '.png', '.gif', '.txt', '.csv'],
     "dry_run": False,  # Set to True to test without actual file operations
+    "max_concurrent_files": 16,  # Files migrated in parallel (network-bound, so threads overlap latency)
+    "api_requests_per_second": 10,  # Rate limit for Salesforce update calls
+    "use_bulk_api_for_updates": False,  # Full runs: apply URL updates as Bulk API 2.0 jobs (one per 10,000 files)
     
     # PROOF OF CONCEPT SETTINGS
     "test_single_account": False,  # Set to True to test with just one account
@@ -71,6 +91,175 @@ except ImportError:
     MIGRATION_CONFIG = DEFAULT_MIGRATION_CONFIG
     print("⚠ Using default configuration. Copy config_template.py to config.py for custom settings.")
 
+# Built once from the config: O(1) extension checks per file
+ALLOWED_EXTENSIONS = frozenset(ext.lower() for ext in MIGRATION_CONFIG['allowed_extensions'])
+
+# Substrings identifying source (external) document URLs to migrate
+SOURCE_URL_MARKERS = ('trackland-doc-storage',)
+
+# Files and folders for a set of accounts; account_filter is an already-bound
+# format_soql() fragment, inserted verbatim
+DOCLIST_ENTRIES_SOQL = """
+    SELECT Id, Name, Document__c, Type_Current__c, Type_Original__c,
+           DocType__c, Parent_Folder__c, Visibility__c, Identifier__c,
+           Source__c, ClientName__c, ApplicableYear__c, TaxonomyStage__c,
+           Account__c, Account__r.Name, CreatedDate, LastModifiedDate
+    FROM DocListEntry__c
+    WHERE {account_filter:literal}
+    AND IsDeleted = FALSE
+    AND Type_Current__c IN ('Document', 'Folder')
+    ORDER BY Account__c, Name
+"""
+
+# Account IDs per DocListEntry__c query IN-clause (~4KB of SOQL, far below the length limit)
+ACCOUNT_BATCH_SIZE = 200
+
+# Records per sObject Collections update (API maximum)
+COLLECTION_BATCH_SIZE = 200
+
+
+# Seconds between Bulk API 2.0 job status checks
+BULK_POLL_INTERVAL = 5
+
+# Give up on (and abort) a Bulk API 2.0 job still running after this many seconds
+BULK_JOB_TIMEOUT = 60 * 60
+
+# Bulk API 2.0 rejects uploads over 150 MB; stay well below it per job
+BULK_UPLOAD_MAX_BYTES = 100 * 1024 * 1024
+
+# URL updates collected before submitting a Bulk API 2.0 job, so a crash
+# mid-run loses at most this many Salesforce updates
+BULK_UPDATE_BATCH_SIZE = 10000
+
+# Multipart threshold/part size for streamed S3 uploads
+STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Objects above this are copied server-side as parallel multipart copies
+SERVER_COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Parts of one file transferred at once; the S3 connection pool holds this
+# many connections per concurrently migrated file
+S3_TRANSFER_CONCURRENCY = 4
+
+# S3 user metadata on streamed copies: the source's Content-Length (before any decoding)
+SOURCE_LENGTH_METADATA_KEY = 'source-content-length'
+
+# S3 hostnames: <bucket>.s3[.-<region>].amazonaws.com (virtual-hosted) or
+# s3[.-<region>].amazonaws.com (path-style, bucket is the first path segment)
+_S3_VIRTUAL_HOST_RE = re.compile(r'^(?P<bucket>.+)\.s3(?:[.-][a-z0-9-]+)?\.amazonaws\.com$')
+_S3_PATH_HOST_RE = re.compile(r'^s3(?:[.-][a-z0-9-]+)?\.amazonaws\.com$')
+
+
+def parse_s3_url(url: str) -> Optional[Tuple[str, str]]:
+    """Return ``(bucket, key)`` for an S3 HTTPS URL, or None if it isn't one."""
+    parsed = urlparse(url)
+    host = parsed.hostname or ''
+    path = unquote(parsed.path.lstrip('/'))
+    
+    match = _S3_VIRTUAL_HOST_RE.match(host)
+    if match and path:
+        return match.group('bucket'), path
+    if _S3_PATH_HOST_RE.match(host) and '/' in path:
+        bucket, key = path.split('/', 1)
+        return bucket, key
+    return None
+
+
+# Characters dropped from S3 key parts. \w matches exactly what str.isalnum()
+# accepts plus '_', so these equal the old per-character filters.
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w .\-]+')
+_UNSAFE_FOLDER_CHARS = re.compile(r'[^\w \-]+')
+
+
+@lru_cache(maxsize=4096)
+def _sanitize_filename(name: str) -> str:
+    """Strip characters that aren't safe in an S3 key filename."""
+    return _UNSAFE_FILENAME_CHARS.sub('', name).strip()
+
+
+@lru_cache(maxsize=4096)
+def _sanitize_folder_name(name: str) -> str:
+    """Strip characters that aren't safe in an S3 key folder (account and folder names repeat heavily)."""
+    return _UNSAFE_FOLDER_CHARS.sub('', name).strip()
+
+
+# =============================================================================
+# RECORDS
+# =============================================================================
+
+class FileEntry(NamedTuple):
+    """A DocListEntry__c document to migrate (a tuple is far smaller than a 14-key dict)."""
+    doclistentry_id: str
+    name: str
+    document_url: str
+    type_current: str
+    type_original: Optional[str]
+    doc_type: Optional[str]
+    parent_folder_id: Optional[str]
+    identifier: Optional[str]
+    client_name: Optional[str]
+    applicable_year: Optional[str]
+    account_id: str
+    account_name: str
+    created_date: str
+    last_modified_date: str
+
+
+class FolderEntry(NamedTuple):
+    """A DocListEntry__c folder, used to build S3 key paths."""
+    name: str
+    parent_folder_id: Optional[str]
+    identifier: Optional[str]
+    year: Optional[str]
+
+
+# =============================================================================
+# RETRIES
+# =============================================================================
+
+# S3 error codes worth retrying (throttling and server-side faults)
+_TRANSIENT_S3_ERROR_CODES = frozenset((
+    'SlowDown', 'Throttling', 'ThrottlingException', 'RequestTimeout',
+    'RequestTimeTooSkewed', 'InternalError', 'ServiceUnavailable'
+))
+
+
+def retry(fn, max_attempts: int = 5, initial_delay: float = 0.5, max_delay: float = 30,
+          backoff_multiplier: float = 2, jitter: bool = True, retry_if=lambda e: True):
+    """Call ``fn`` until it succeeds, backing off exponentially between attempts.
+    
+    Only exceptions for which ``retry_if`` returns True are retried; anything
+    else, or the last attempt's failure, is raised to the caller. Jitter
+    spreads out retries from parallel workers that failed together.
+    """
+    delay = initial_delay
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_attempts or not retry_if(e):
+                raise
+            time.sleep(random.uniform(0, delay) if jitter else delay)
+            delay = min(max_delay, delay * backoff_multiplier)
+
+
+def is_transient_network_error(error: Exception) -> bool:
+    """True for dropped/timed-out connections and throttled or failing S3 calls."""
+    if isinstance(error, ClientError):
+        return (error.response['Error']['Code'] in _TRANSIENT_S3_ERROR_CODES
+                or error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500)
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                              requests.exceptions.ChunkedEncodingError, BotoConnectionError,
+                              Urllib3HTTPError))
+
+
+def is_transient_salesforce_error(error: Exception) -> bool:
+    """True for Salesforce throttling (REQUEST_LIMIT_EXCEEDED), server errors and dropped connections."""
+    if isinstance(error, SalesforceError):
+        return error.status >= 500 or 'REQUEST_LIMIT_EXCEEDED' in str(error.content)
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
 # =============================================================================
 # LOGGING SETUP
 # =============================================================================
@@ -108,6 +297,10 @@ class SalesforceManager:
         self.config = config
         self.logger = logger
         self.sf = None
+        # Folder trees per account; they don't change during a run
+        self._folder_cache: Dict[str, Dict[str, FolderEntry]] = {}
+        # Shared by all migration threads so parallel updates stay under the org's limits
+        self.rate_limiter = RateLimiter(MIGRATION_CONFIG.get('api_requests_per_second', 10))
         
     def authenticate(self) -> bool:
         """Authenticate with Salesforce."""
@@ -130,34 +323,29 @@ class SalesforceManager:
             return False
     
     def get_doclistentry_files(self, test_account_id: Optional[str] = None, 
-                              test_account_name: Optional[str] = None) -> List[Dict]:
+                              test_account_name: Optional[str] = None) -> List[FileEntry]:
         """Get DocListEntry__c records with S3 URLs linked to Account objects."""
+        return list(self.iter_doclistentry_files(test_account_id, test_account_name))
+    
+    def iter_doclistentry_files(self, test_account_id: Optional[str] = None,
+                                test_account_name: Optional[str] = None) -> Iterator[FileEntry]:
+        """Yield DocListEntry__c files with S3 URLs, one account batch at a time.
+        
+        Records are paged in with query_all_iter rather than collected into
+        one result list. A batch's files are yielded once its query finishes,
+        so the batch's folders are already cached for generate_s3_key.
+        """
         try:
             target_account_ids = []
             
-            # Resolve account name to ID if needed
-            if test_account_name and not test_account_id:
-                self.logger.info(f"Looking up Account ID for name: {test_account_name}")
-                account_query = f"""
-                    SELECT Id, Name
-                    FROM Account
-                    WHERE Name = '{test_account_name}'
-                    AND IsDeleted = FALSE
-                    LIMIT 1
-                """
-                
-                account_result = self.sf.query(account_query)
-                if account_result['records']:
-                    test_account_id = account_result['records'][0]['Id']
-                    self.logger.info(f"Found Account ID: {test_account_id} for name: {test_account_name}")
-                else:
-                    self.logger.error(f"No account found with name: {test_account_name}")
-                    return []
-            
-            # Prepare account IDs for filtering
+            # Prepare account filters; values are bound with format_soql so quotes
+            # in names can't break (or inject into) the query
             if test_account_id:
                 target_account_ids = [test_account_id]
                 self.logger.info(f"Filtering by Account ID: {test_account_id}")
+            elif test_account_name:
+                # Filter on the relationship directly instead of looking up the Account Id first
+                self.logger.info(f"Filtering by Account name: {test_account_name}")
             else:
                 # Get all accounts with DocListEntry__c records
                 self.logger.info("Getting all accounts with DocListEntry__c records...")
@@ -176,97 +364,115 @@ class SalesforceManager:
                 
                 self.logger.info(f"Found {len(target_account_ids)} accounts with DocListEntry__c files")
             
-            if not target_account_ids:
+            if test_account_name and not test_account_id:
+                account_filters = [format_soql("Account__r.Name = {}", test_account_name)]
+            elif target_account_ids:
+                account_filters = [
+                    format_soql("Account__c IN {}", target_account_ids[i:i + ACCOUNT_BATCH_SIZE])
+                    for i in range(0, len(target_account_ids), ACCOUNT_BATCH_SIZE)
+                ]
+            else:
                 self.logger.warning("No accounts with DocListEntry__c files found")
-                return []
+                return
             
             # Now query DocListEntry__c records for the target accounts
-            all_files = []
-            batch_size = 20  # Process account IDs in batches
+            file_count = 0
             
-            for i in range(0, len(target_account_ids), batch_size):
-                batch_ids = target_account_ids[i:i + batch_size]
-                ids_str = "', '".join(batch_ids)
-                
-                # Query DocListEntry__c records for this batch of accounts
-                files_query = f"""
-                    SELECT Id, Name, Document__c, Type_Current__c, Type_Original__c, 
-                           DocType__c, Parent_Folder__c, Visibility__c, Identifier__c,
-                           Source__c, ClientName__c, ApplicableYear__c, TaxonomyStage__c,
-                           Account__c, Account__r.Name, CreatedDate, LastModifiedDate
-                    FROM DocListEntry__c
-                    WHERE Account__c IN ('{ids_str}')
-                    AND IsDeleted = FALSE
-                    AND Document__c != NULL
-                    AND Type_Current__c = 'Document'
-                    ORDER BY Account__c, Name
-                """
+            for account_filter in account_filters:
+                # Files and folders for this batch of accounts in one query; folders
+                # go straight into the folder cache so get_folder_structure needs
+                # no query of its own
+                entries_query = format_soql(DOCLIST_ENTRIES_SOQL, account_filter=account_filter)
                 
                 try:
-                    self.logger.info(f"Querying DocListEntry__c files for batch {i//batch_size + 1}/{(len(target_account_ids) + batch_size - 1)//batch_size}")
-                    result = self.sf.query_all(files_query)
+                    batch_files = []
+                    batch_folders = {}
+                    for record in self.sf.query_all_iter(entries_query):
+                        # Every account seen gets a cache entry, even with no folders
+                        account_folders = batch_folders.setdefault(record['Account__c'], {})
+                        if record['Type_Current__c'] == 'Folder':
+                            account_folders[record['Id']] = FolderEntry(
+                                record['Name'],
+                                record.get('Parent_Folder__c'),
+                                record['Identifier__c'],
+                                record.get('ApplicableYear__c')
+                            )
+                            continue
+                        
+                        if not record['Document__c']:
+                            continue
+                        
+                        batch_files.append(FileEntry(
+                            doclistentry_id=record['Id'],
+                            name=record['Name'],
+                            document_url=record['Document__c'],
+                            type_current=record['Type_Current__c'],
+                            type_original=record['Type_Original__c'],
+                            doc_type=record['DocType__c'],
+                            parent_folder_id=record.get('Parent_Folder__c'),
+                            identifier=record['Identifier__c'],
+                            client_name=record.get('ClientName__c'),
+                            applicable_year=record.get('ApplicableYear__c'),
+                            account_id=record['Account__c'],
+                            account_name=record['Account__r']['Name'],
+                            created_date=record['CreatedDate'],
+                            last_modified_date=record['LastModifiedDate']
+                        ))
                     
-                    for record in result['records']:
-                        file_info = {
-                            'doclistentry_id': record['Id'],
-                            'name': record['Name'],
-                            'document_url': record['Document__c'],
-                            'type_current': record['Type_Current__c'],
-                            'type_original': record['Type_Original__c'],
-                            'doc_type': record['DocType__c'],
-                            'parent_folder_id': record.get('Parent_Folder__c'),
-                            'identifier': record['Identifier__c'],
-                            'client_name': record.get('ClientName__c'),
-                            'applicable_year': record.get('ApplicableYear__c'),
-                            'account_id': record['Account__c'],
-                            'account_name': record['Account__r']['Name'],
-                            'created_date': record['CreatedDate'],
-                            'last_modified_date': record['LastModifiedDate']
-                        }
-                        all_files.append(file_info)
+                    self._folder_cache.update(batch_folders)
                         
                 except SalesforceError as e:
                     self.logger.error(f"Error querying DocListEntry__c files for batch: {e}")
                     continue
+                
+                file_count += len(batch_files)
+                yield from batch_files
             
-            self.logger.info(f"Found {len(all_files)} DocListEntry__c files with S3 URLs")
-            return all_files
+            self.logger.info(f"Found {file_count} DocListEntry__c files with S3 URLs ({len(account_filters)} queries)")
             
         except SalesforceError as e:
             self.logger.error(f"Error querying Salesforce: {e}")
-            return []
         except Exception as e:
             self.logger.error(f"Unexpected error querying files: {e}")
-            return []
     
-    def get_folder_structure(self, account_id: str) -> Dict[str, Dict]:
-        """Get folder structure for an account."""
-        try:
-            folders_query = f"""
-                SELECT Id, Name, Parent_Folder__c, Identifier__c, ApplicableYear__c
-                FROM DocListEntry__c
-                WHERE Account__c = '{account_id}'
-                AND IsDeleted = FALSE
-                AND Type_Current__c = 'Folder'
-                ORDER BY Name
-            """
-            
-            result = self.sf.query_all(folders_query)
-            folders = {}
-            
-            for record in result['records']:
-                folders[record['Id']] = {
-                    'name': record['Name'],
-                    'parent_folder_id': record.get('Parent_Folder__c'),
-                    'identifier': record['Identifier__c'],
-                    'year': record.get('ApplicableYear__c')
-                }
-            
+    def get_folder_structure(self, account_id: str) -> Dict[str, FolderEntry]:
+        """Get folder structure for an account (queried once per account per run)."""
+        folders = self._folder_cache.get(account_id)
+        if folders is not None:
             return folders
-            
+        
+        try:
+            folders = self._fetch_folder_structure(account_id)
         except Exception as e:
             self.logger.error(f"Error getting folder structure: {e}")
             return {}
+        
+        self._folder_cache[account_id] = folders
+        return folders
+    
+    def _fetch_folder_structure(self, account_id: str) -> Dict[str, FolderEntry]:
+        """Query an account's folders from Salesforce."""
+        folders_query = format_soql("""
+            SELECT Id, Name, Parent_Folder__c, Identifier__c, ApplicableYear__c
+            FROM DocListEntry__c
+            WHERE Account__c = {}
+            AND IsDeleted = FALSE
+            AND Type_Current__c = 'Folder'
+            ORDER BY Name
+        """, account_id)
+        
+        result = self.sf.query_all(folders_query)
+        folders = {}
+        
+        for record in result['records']:
+            folders[record['Id']] = FolderEntry(
+                record['Name'],
+                record.get('Parent_Folder__c'),
+                record['Identifier__c'],
+                record.get('ApplicableYear__c')
+            )
+        
+        return folders
     
     def update_doclistentry_url(self, doclistentry_id: str, new_s3_url: str) -> bool:
         """Update the Document__c URL in DocListEntry__c record."""
@@ -275,7 +481,11 @@ class SalesforceManager:
                 'Document__c': new_s3_url
             }
             
-            result = self.sf.DocListEntry__c.update(doclistentry_id, update_data)
+            def send_update():
+                self.rate_limiter.acquire()
+                return self.sf.DocListEntry__c.update(doclistentry_id, update_data)
+            
+            result = retry(send_update, retry_if=is_transient_salesforce_error)
             
             if result == 204:  # Success response for update
                 self.logger.info(f"Successfully updated DocListEntry__c URL: {doclistentry_id}")
@@ -287,6 +497,146 @@ class SalesforceManager:
         except Exception as e:
             self.logger.error(f"Error updating DocListEntry__c URL: {e}")
             return False
+    
+    def update_doclistentry_urls_bulk(self, updates: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """Update Document__c URLs 200 records per sObject Collections call.
+        
+        Returns the success of each DocListEntry__c ID. A chunk whose request
+        fails outright is retried record by record with update_doclistentry_url.
+        """
+        results = {}
+        
+        for i in range(0, len(updates), COLLECTION_BATCH_SIZE):
+            chunk = updates[i:i + COLLECTION_BATCH_SIZE]
+            body = {
+                'allOrNone': False,
+                'records': [
+                    {'attributes': {'type': 'DocListEntry__c'}, 'Id': doclistentry_id, 'Document__c': url}
+                    for doclistentry_id, url in chunk
+                ]
+            }
+            
+            def send_chunk():
+                self.rate_limiter.acquire()
+                return self.sf.restful('composite/sobjects', method='PATCH', json=body)
+            
+            try:
+                response = retry(send_chunk, retry_if=is_transient_salesforce_error)
+            except Exception as e:
+                self.logger.warning(f"Bulk DocListEntry__c update failed, updating records individually: {e}")
+                for doclistentry_id, url in chunk:
+                    results[doclistentry_id] = self.update_doclistentry_url(doclistentry_id, url)
+                continue
+            
+            # Results come back in request order
+            for (doclistentry_id, _), result in zip(chunk, response):
+                results[doclistentry_id] = result['success']
+                if not result['success']:
+                    self.logger.error(f"Failed to update DocListEntry__c URL {doclistentry_id}: {result['errors']}")
+            
+            self.logger.info(f"Updated {sum(r['success'] for r in response)}/{len(chunk)} DocListEntry__c URLs")
+        
+        return results
+    
+    def submit_bulk_update(self, updates: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """Update Document__c URLs with Bulk API 2.0 ingest jobs.
+        
+        Each job costs a handful of API calls regardless of size and runs
+        asynchronously on the platform; this blocks until they finish. Updates
+        are split into uploads under BULK_UPLOAD_MAX_BYTES, one job each. A
+        job that can't be run (upload error, timeout) is aborted and its
+        updates go through sObject Collections instead.
+        Returns the success of each DocListEntry__c ID.
+        """
+        results = {}
+        for csv_body, chunk in self._bulk_update_uploads(updates):
+            try:
+                results.update(self._run_bulk_update_job(csv_body, chunk))
+            except Exception as e:
+                self.logger.warning(f"Bulk API update failed, falling back to sObject Collections: {e}")
+                results.update(self.update_doclistentry_urls_bulk(chunk))
+        return results
+    
+    def _bulk_update_uploads(self, updates: List[Tuple[str, str]]) -> Iterator[Tuple[bytes, List[Tuple[str, str]]]]:
+        """Yield (CSV body, updates) pairs, each body under BULK_UPLOAD_MAX_BYTES."""
+        header = b'Id,Document__c\n'
+        row_buffer = io.StringIO()
+        writer = csv.writer(row_buffer, lineterminator='\n')
+        lines, chunk, size = [], [], len(header)
+        
+        for update in updates:
+            writer.writerow(update)
+            line = row_buffer.getvalue().encode('utf-8')
+            row_buffer.seek(0)
+            row_buffer.truncate()
+            
+            if chunk and size + len(line) > BULK_UPLOAD_MAX_BYTES:
+                yield header + b''.join(lines), chunk
+                lines, chunk, size = [], [], len(header)
+            lines.append(line)
+            chunk.append(update)
+            size += len(line)
+        
+        if chunk:
+            yield header + b''.join(lines), chunk
+    
+    def _run_bulk_update_job(self, csv_body: bytes, updates: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """Run one Bulk API 2.0 update job, aborting it if it can't be seen through."""
+        job = self.sf.restful('jobs/ingest', method='POST', json={
+            'object': 'DocListEntry__c',
+            'operation': 'update',
+            'contentType': 'CSV',
+            'lineEnding': 'LF'
+        })
+        job_url = f"{self.sf.base_url}jobs/ingest/{job['id']}"
+        auth_header = {'Authorization': f"Bearer {self.sf.session_id}"}
+        self.logger.info(f"Created Bulk API job {job['id']} for {len(updates)} DocListEntry__c updates")
+        
+        try:
+            # The upload and result endpoints speak CSV and may return empty
+            # bodies, so they go through the HTTP session rather than restful()
+            response = self.sf.session.put(
+                f"{job_url}/batches", data=csv_body,
+                headers={**auth_header, 'Content-Type': 'text/csv'}
+            )
+            response.raise_for_status()
+            self.sf.restful(f"jobs/ingest/{job['id']}", method='PATCH', json={'state': 'UploadComplete'})
+            
+            deadline = time.monotonic() + BULK_JOB_TIMEOUT
+            while True:
+                time.sleep(BULK_POLL_INTERVAL)
+                status = self.sf.restful(f"jobs/ingest/{job['id']}")
+                if status['state'] in ('JobComplete', 'Failed', 'Aborted'):
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Bulk API job {job['id']} still {status['state']} after {BULK_JOB_TIMEOUT}s")
+        except Exception:
+            self._abort_bulk_job(job['id'])
+            raise
+        
+        if status['state'] != 'JobComplete':
+            self.logger.error(f"Bulk API job {job['id']} ended in state {status['state']}: {status.get('errorMessage')}")
+            return {doclistentry_id: False for doclistentry_id, _ in updates}
+        
+        results = {doclistentry_id: True for doclistentry_id, _ in updates}
+        if status['numberRecordsFailed']:
+            response = self.sf.session.get(f"{job_url}/failedResults/", headers=auth_header)
+            response.raise_for_status()
+            for row in csv.DictReader(io.StringIO(response.text)):
+                results[row['Id']] = False
+                self.logger.error(f"Failed to update DocListEntry__c URL {row['Id']}: {row['sf__Error']}")
+        
+        self.logger.info(f"Bulk API job {job['id']} complete: {status['numberRecordsProcessed']} processed, "
+                         f"{status['numberRecordsFailed']} failed")
+        return results
+    
+    def _abort_bulk_job(self, job_id: str):
+        """Abort a Bulk API 2.0 job so it doesn't linger open (or keep running) on the org."""
+        try:
+            self.sf.restful(f"jobs/ingest/{job_id}", method='PATCH', json={'state': 'Aborted'})
+            self.logger.info(f"Aborted Bulk API job {job_id}")
+        except Exception as e:
+            self.logger.warning(f"Could not abort Bulk API job {job_id}: {e}")
 
 
 # =============================================================================
@@ -300,10 +650,27 @@ class S3Manager:
         self.config = config
         self.logger = logger
         self.s3_client = None
+        # Source buckets our credentials can't read; those files are streamed instead
+        self._unreadable_buckets: set = set()
+        # One keep-alive connection pool shared by all migration threads, so each
+        # download reuses a warm TLS connection instead of opening its own
+        pool_size = MIGRATION_CONFIG.get('max_concurrent_files', 16)
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        ))
         
     def authenticate(self) -> bool:
         """Initialize S3 client."""
         try:
+            # Room for every migration thread's multipart transfers, so parts don't
+            # queue on (or discard) pooled connections
+            client_config = BotoConfig(
+                max_pool_connections=MIGRATION_CONFIG.get('max_concurrent_files', 16) * S3_TRANSFER_CONCURRENCY
+            )
+            
             # Check if credentials are provided in config
             if (self.config.get('access_key_id') and 
                 self.config.get('secret_access_key') and
@@ -315,18 +682,18 @@ class S3Manager:
                     's3',
                     region_name=self.config['region'],
                     aws_access_key_id=self.config['access_key_id'],
-                    aws_secret_access_key=self.config['secret_access_key']
+                    aws_secret_access_key=self.config['secret_access_key'],
+                    config=client_config
                 )
                 self.logger.info("Using AWS credentials from config file")
             else:
                 # Fall back to default credential chain (AWS CLI, environment variables, IAM roles)
-                self.s3_client = boto3.client('s3', region_name=self.config['region'])
+                self.s3_client = boto3.client('s3', region_name=self.config['region'], config=client_config)
                 self.logger.info("Using default AWS credential chain")
             
-            # Test connection by listing buckets
-            self.s3_client.list_buckets()
-            
-            self.logger.info("Successfully authenticated with AWS S3")
+            # Credentials are verified by the head_bucket in create_bucket_if_not_exists,
+            # which needs no account-wide s3:ListAllMyBuckets permission
+            self.logger.info("Initialized AWS S3 client")
             return True
             
         except NoCredentialsError:
@@ -366,7 +733,10 @@ class S3Manager:
                 else:
                     self.logger.error(f"Error checking bucket existence: {e}")
                     return False
-                    
+        
+        except NoCredentialsError:
+            self.logger.error("AWS credentials not found. Please configure your credentials in config.py or use AWS CLI.")
+            return False
         except Exception as e:
             self.logger.error(f"Error creating S3 bucket: {e}")
             return False
@@ -377,7 +747,7 @@ class S3Manager:
             self.logger.info(f"Downloading from external S3: {s3_url}")
             
             # Download using requests (public URL)
-            response = requests.get(s3_url, timeout=60)
+            response = retry(lambda: self.http.get(s3_url, timeout=(5, 60)), retry_if=is_transient_network_error)
             
             if response.status_code == 200:
                 self.logger.info(f"Successfully downloaded file ({len(response.content)} bytes)")
@@ -390,18 +760,159 @@ class S3Manager:
             self.logger.error(f"Error downloading from external S3: {e}")
             return None
     
+    def exists(self, s3_key: str) -> Optional[Dict]:
+        """Return the object's metadata if ``s3_key`` is already in our bucket, else None."""
+        try:
+            return self.s3_client.head_object(Bucket=self.config['bucket_name'], Key=s3_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+                self.logger.warning(f"Could not check for existing S3 object {s3_key}: {e}")
+            return None
+    
+    def is_already_copied(self, src_url: str, s3_key: str) -> bool:
+        """Check whether ``s3_key`` already holds a complete copy of ``src_url``.
+        
+        Sizes are compared rather than ETags: multipart uploads give the copy
+        a different ETag from the source even when the bytes are identical.
+        A streamed copy stores its source's Content-Length in metadata, since
+        a source served with Content-Encoding is stored decoded (larger).
+        """
+        existing = self.exists(s3_key)
+        if existing is None:
+            return False
+        
+        try:
+            response = self.http.head(src_url, timeout=(5, 30))
+            source_size = response.headers.get('Content-Length')
+        except Exception as e:
+            self.logger.warning(f"Could not check source size for {src_url}, copying again: {e}")
+            return False
+        
+        copied_size = existing.get('Metadata', {}).get(SOURCE_LENGTH_METADATA_KEY, existing['ContentLength'])
+        return response.status_code == 200 and source_size is not None and int(source_size) == int(copied_size)
+    
+    def copy_from_url(self, src_url: str, s3_key: str) -> Optional[Tuple[str, int]]:
+        """Copy a file into our bucket, server-side when the source is a readable S3 object.
+        
+        Falls back to stream_copy for non-S3 URLs and for source buckets our
+        credentials can't access. Returns the new S3 URL and the bytes copied.
+        """
+        source = parse_s3_url(src_url)
+        if source is None or source[0] in self._unreadable_buckets:
+            return self.stream_copy(src_url, s3_key)
+        
+        src_bucket, src_key = source
+        try:
+            src_size = self.s3_client.head_object(Bucket=src_bucket, Key=src_key)['ContentLength']
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('403', 'AccessDenied'):
+                self.logger.info(f"No direct access to source bucket {src_bucket}; streaming its files instead")
+                self._unreadable_buckets.add(src_bucket)
+            else:
+                self.logger.warning(f"Could not read source object for server-side copy, streaming instead: {e}")
+            return self.stream_copy(src_url, s3_key)
+        
+        return self.server_side_copy(src_bucket, src_key, s3_key, src_size)
+    
+    def server_side_copy(self, src_bucket: str, src_key: str, s3_key: str,
+                         size: int) -> Optional[Tuple[str, int]]:
+        """Copy an S3 object into our bucket inside AWS (no bytes pass through this host)."""
+        try:
+            bucket_name = self.config['bucket_name']
+            retry(lambda: self.s3_client.copy(
+                {'Bucket': src_bucket, 'Key': src_key}, bucket_name, s3_key,
+                Config=TransferConfig(
+                    multipart_threshold=SERVER_COPY_CHUNK_SIZE,
+                    multipart_chunksize=SERVER_COPY_CHUNK_SIZE,
+                    max_concurrency=S3_TRANSFER_CONCURRENCY
+                )
+            ), retry_if=is_transient_network_error)
+            
+            s3_url = f"https://{bucket_name}.s3.{self.config['region']}.amazonaws.com/{s3_key}"
+            self.logger.info(f"Successfully copied file server-side to S3: {s3_key} ({size} bytes)")
+            return s3_url, size
+            
+        except Exception as e:
+            self.logger.error(f"Error copying s3://{src_bucket}/{src_key} server-side: {e}")
+            return None
+    
+    def stream_copy(self, src_url: str, s3_key: str,
+                    content_type: str = 'binary/octet-stream') -> Optional[Tuple[str, int]]:
+        """Stream a file from an external URL straight into our S3 bucket.
+        
+        The body is piped from the HTTP response to a (multipart, for large
+        files) upload that buffers at most S3_TRANSFER_CONCURRENCY parts of
+        STREAM_CHUNK_SIZE, so memory per file stays at a few chunks instead
+        of the whole object. Returns the new S3 URL and the bytes copied.
+        """
+        try:
+            bucket_name = self.config['bucket_name']
+            transfer_config = TransferConfig(
+                multipart_threshold=STREAM_CHUNK_SIZE,
+                multipart_chunksize=STREAM_CHUNK_SIZE,
+                max_concurrency=S3_TRANSFER_CONCURRENCY,
+                use_threads=True
+            )
+            # Parts read ahead from a non-seekable stream are held in memory
+            # (10 by default); keep no more than are being uploaded at once
+            transfer_config.max_in_memory_upload_chunks = S3_TRANSFER_CONCURRENCY
+            copied = [0]
+            copied_lock = threading.Lock()
+            
+            def count_bytes(n: int):
+                # Called from boto3's transfer threads
+                with copied_lock:
+                    copied[0] += n
+            
+            def copy_once() -> bool:
+                # A stream can't be rewound, so each attempt starts a fresh download
+                copied[0] = 0
+                with self.http.get(src_url, stream=True, timeout=(5, 60)) as response:
+                    if response.status_code != 200:
+                        self.logger.error(f"Failed to download file. Status: {response.status_code}")
+                        return False
+                    
+                    # Undo any Content-Encoding while streaming, as response.content would;
+                    # the source's own length is kept for is_already_copied
+                    response.raw.decode_content = True
+                    extra_args = {'ContentType': content_type}
+                    source_length = response.headers.get('Content-Length')
+                    if source_length is not None:
+                        extra_args['Metadata'] = {SOURCE_LENGTH_METADATA_KEY: source_length}
+                    self.s3_client.upload_fileobj(
+                        response.raw, bucket_name, s3_key,
+                        ExtraArgs=extra_args,
+                        Config=transfer_config,
+                        Callback=count_bytes
+                    )
+                return True
+            
+            if not retry(copy_once, retry_if=is_transient_network_error):
+                return None
+            
+            s3_url = f"https://{bucket_name}.s3.{self.config['region']}.amazonaws.com/{s3_key}"
+            self.logger.info(f"Successfully streamed file to S3: {s3_key} ({copied[0]} bytes)")
+            return s3_url, copied[0]
+            
+        except ClientError as e:
+            self.logger.error(f"Error uploading file to S3: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error streaming file from external S3: {e}")
+            return None
+    
     def upload_file(self, file_content: bytes, s3_key: str, 
                    content_type: str = 'binary/octet-stream') -> Optional[str]:
         """Upload file to S3."""
         try:
             bucket_name = self.config['bucket_name']
             
-            self.s3_client.put_object(
+            retry(lambda: self.s3_client.put_object(
                 Bucket=bucket_name,
                 Key=s3_key,
                 Body=file_content,
                 ContentType=content_type
-            )
+            ), retry_if=is_transient_network_error)
             
             s3_url = f"https://{bucket_name}.s3.{self.config['region']}.amazonaws.com/{s3_key}"
             self.logger.info(f"Successfully uploaded file to S3: {s3_key}")
@@ -431,8 +942,21 @@ class MigrationOrchestrator:
             'successful_migrations': 0,
             'failed_migrations': 0,
             'skipped_files': 0,
+            'already_copied': 0,
             'total_size_mb': 0
         }
+        # migrate_file runs on worker threads; all stats updates go through _record
+        self._stats_lock = threading.Lock()
+        self.skip_reasons = Counter()
+        # Set by run_migration for whole-org runs configured to use Bulk API 2.0
+        self.use_bulk_api = False
+        # Sanitized folder path per folder ID (IDs are unique across accounts)
+        self._folder_path_cache: Dict[str, Tuple[str, ...]] = {}
+    
+    def _record(self, stat: str, amount: float = 1):
+        """Add to a migration statistic from any worker thread."""
+        with self._stats_lock:
+            self.migration_stats[stat] += amount
     
     def initialize(self) -> bool:
         """Initialize all connections and resources."""
@@ -456,136 +980,153 @@ class MigrationOrchestrator:
         self.logger.info("Initialization completed successfully")
         return True
     
-    def should_process_file(self, file_info: Dict) -> Tuple[bool, str]:
-        """Determine if a file should be processed."""
+    def should_process_file(self, file_info: FileEntry) -> Optional[str]:
+        """Return why a file should be skipped, or None if it should be processed."""
         # Check if S3 URL exists
-        if not file_info.get('document_url'):
-            return False, "No S3 URL found"
+        document_url = file_info.document_url
+        if not document_url:
+            return "No S3 URL found"
         
         # Check if it's trackland S3 URL (external)
-        if 'trackland-doc-storage' not in file_info['document_url']:
-            return False, "Not a trackland S3 URL"
-        
-        # Get file extension from filename
-        filename = file_info['name']
-        file_ext = None
-        if '.' in filename:
-            file_ext = '.' + filename.split('.')[-1].lower()
+        if not any(marker in document_url for marker in SOURCE_URL_MARKERS):
+            return "Not a trackland S3 URL"
         
         # Check file extension
-        if file_ext and file_ext not in MIGRATION_CONFIG['allowed_extensions']:
-            return False, f"File extension not allowed: {file_ext}"
+        file_ext = os.path.splitext(file_info.name)[1].lower()
+        if file_ext and file_ext not in ALLOWED_EXTENSIONS:
+            return f"File extension not allowed: {file_ext}"
         
-        return True, "OK"
+        return None
     
-    def generate_s3_key(self, file_info: Dict, folders: Dict[str, Dict]) -> str:
+    def generate_s3_key(self, file_info: FileEntry, folders: Dict[str, FolderEntry]) -> str:
         """Generate S3 key following the required structure with folder hierarchy."""
-        account_id = file_info['account_id']
-        filename = file_info['name']
+        account_id = file_info.account_id
+        filename = file_info.name
         
         # Clean filename for S3
-        safe_filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_', '.')).strip()
+        safe_filename = _sanitize_filename(filename)
         
         # Build folder path from parent hierarchy
-        folder_path = []
-        current_folder_id = file_info.get('parent_folder_id')
-        
-        # Traverse up the folder hierarchy
-        while current_folder_id and current_folder_id in folders:
-            folder_info = folders[current_folder_id]
-            folder_name = "".join(c for c in folder_info['name'] if c.isalnum() or c in (' ', '-', '_')).strip()
-            folder_path.insert(0, folder_name)  # Insert at beginning to maintain hierarchy
-            current_folder_id = folder_info.get('parent_folder_id')
+        folder_path = self._folder_path(file_info.parent_folder_id, folders)
         
         # Use account name as base folder name (sanitized)
-        base_folder_name = "".join(c for c in file_info['account_name'] if c.isalnum() or c in (' ', '-', '_')).strip()
+        base_folder_name = _sanitize_folder_name(file_info.account_name)
         
-        # Build S3 key with folder hierarchy
-        if folder_path:
-            folder_structure = '/'.join(folder_path)
-            s3_key = f"uploads/{account_id}/{base_folder_name}/{folder_structure}/{safe_filename}"
+        # Build S3 key with folder hierarchy; PurePosixPath drops the empty
+        # segments (and "//" in the key) left by names that sanitize to nothing
+        return str(PurePosixPath('uploads', account_id, base_folder_name, *folder_path, safe_filename))
+    
+    def _folder_path(self, folder_id: Optional[str], folders: Dict[str, FolderEntry]) -> Tuple[str, ...]:
+        """Return the sanitized folder names from the account root down to ``folder_id``.
+        
+        Paths are cached per folder ID, including every ancestor visited on the
+        way up, so files sharing a parent (or any ancestor) reuse the walk.
+        """
+        # Walk up until the root or a folder whose path is already known
+        chain = []
+        current_folder_id = folder_id
+        while current_folder_id and current_folder_id in folders:
+            cached = self._folder_path_cache.get(current_folder_id)
+            if cached is not None:
+                break
+            chain.append(current_folder_id)
+            current_folder_id = folders[current_folder_id].parent_folder_id
         else:
-            s3_key = f"uploads/{account_id}/{base_folder_name}/{safe_filename}"
+            cached = ()
+        
+        # Build back down, caching each folder's path
+        path = cached
+        for chain_folder_id in reversed(chain):
+            path = path + (_sanitize_folder_name(folders[chain_folder_id].name),)
+            self._folder_path_cache[chain_folder_id] = path
         
-        return s3_key
+        return path
     
-    def migrate_file(self, file_info: Dict, folders: Dict[str, Dict]) -> bool:
-        """Migrate a single file from external S3 to our S3."""
+    def migrate_file(self, file_info: FileEntry, folders: Dict[str, FolderEntry]) -> Optional[Tuple[str, str]]:
+        """Copy a single file from external S3 to our S3.
+        
+        Returns the ``(doclistentry_id, new_s3_url)`` update still to be made
+        in Salesforce, or None when there is nothing to update (skipped,
+        failed, or dry run). Updates are applied in bulk by run_migration.
+        """
         try:
-            filename = file_info['name']
-            doclistentry_id = file_info['doclistentry_id']
-            account_id = file_info['account_id']
-            external_s3_url = file_info['document_url']
-            
-            self.logger.info(f"Processing file: {filename} (Account: {file_info['account_name']})")
-            
-            # Check if file should be processed
-            should_process, reason = self.should_process_file(file_info)
-            if not should_process:
-                self.logger.warning(f"Skipping file {filename}: {reason}")
-                self.migration_stats['skipped_files'] += 1
-                return False
+            filename = file_info.name
+            
+            # Check if file should be processed before doing any other work
+            skip_reason = self.should_process_file(file_info)
+            if skip_reason:
+                self.logger.warning(f"Skipping file {filename}: {skip_reason}")
+                self._record('skipped_files')
+                with self._stats_lock:
+                    self.skip_reasons[skip_reason] += 1
+                return None
+            
+            doclistentry_id = file_info.doclistentry_id
+            account_id = file_info.account_id
+            external_s3_url = file_info.document_url
+            
+            self.logger.info(f"Processing file: {filename} (Account: {file_info.account_name})")
             
             # Generate S3 key with folder structure
             s3_key = self.generate_s3_key(file_info, folders)
             
             if not MIGRATION_CONFIG['dry_run']:
-                # Download file from external S3
-                self.logger.info(f"Downloading file from external S3: {filename}")
-                file_content = self.s3_manager.download_from_external_s3(external_s3_url)
+                # A rerun after a partial failure only needs the Salesforce update
+                # for files that already made it into our bucket
+                if self.s3_manager.is_already_copied(external_s3_url, s3_key):
+                    bucket_name = AWS_CONFIG['bucket_name']
+                    new_s3_url = f"https://{bucket_name}.s3.{AWS_CONFIG['region']}.amazonaws.com/{s3_key}"
+                    self.logger.info(f"File already in our S3, skipping copy: {s3_key}")
+                    self._record('already_copied')
+                    return doclistentry_id, new_s3_url
                 
-                if not file_content:
-                    self.logger.error(f"Failed to download file from external S3: {filename}")
-                    self.migration_stats['failed_migrations'] += 1
-                    return False
-                
-                # Upload to our S3
-                self.logger.info(f"Uploading file to our S3: {s3_key}")
-                new_s3_url = self.s3_manager.upload_file(file_content, s3_key)
+                # Copy the file from external S3 into our S3
+                self.logger.info(f"Copying file from external S3 to our S3: {s3_key}")
+                copy_result = self.s3_manager.copy_from_url(external_s3_url, s3_key)
                 
-                if not new_s3_url:
-                    self.logger.error(f"Failed to upload file to our S3: {filename}")
-                    self.migration_stats['failed_migrations'] += 1
-                    return False
+                if not copy_result:
+                    self.logger.error(f"Failed to copy file to our S3: {filename}")
+                    self._record('failed_migrations')
+                    return None
                 
-                # Update DocListEntry__c URL in Salesforce
-                self.logger.info(f"Updating DocListEntry__c URL in Salesforce: {filename}")
-                update_success = self.sf_manager.update_doclistentry_url(doclistentry_id, new_s3_url)
+                new_s3_url, size_bytes = copy_result
+                self._record('total_size_mb', size_bytes / (1024 * 1024))
                 
-                if not update_success:
-                    self.logger.error(f"Failed to update DocListEntry__c URL in Salesforce: {filename}")
-                    self.migration_stats['failed_migrations'] += 1
-                    return False
-                
-                self.migration_stats['total_size_mb'] += len(file_content) / (1024 * 1024)
-            else:
-                # Enhanced dry run logging
+                # The DocListEntry__c URL is updated in bulk by run_migration
+                self.logger.info(f"Copied file, Salesforce update queued: {filename}")
+                return doclistentry_id, new_s3_url
+            elif self.logger.isEnabledFor(logging.INFO):
+                # One lazily formatted line per file keeps large dry runs cheap
                 bucket_name = AWS_CONFIG['bucket_name']
                 new_s3_url = f"https://{bucket_name}.s3.{AWS_CONFIG['region']}.amazonaws.com/{s3_key}"
-                
-                self.logger.info("=" * 50)
-                self.logger.info("🔍 DRY RUN - What would happen:")
-                self.logger.info(f"  📁 File: {filename}")
-                self.logger.info(f"  🏢 Account: {file_info['account_name']} ({account_id})")
-                self.logger.info(f"  📂 Folder Path: {s3_key}")
-                self.logger.info(f"  ⬇️  Would download from: {external_s3_url}")
-                self.logger.info(f"  ⬆️  Would upload to: {new_s3_url}")
-                self.logger.info(f"  🔗 Would update DocListEntry__c.Document__c: {doclistentry_id}")
-                self.logger.info(f"  📊 Current URL: {external_s3_url}")
-                self.logger.info(f"  📊 New URL: {new_s3_url}")
-                self.logger.info("=" * 50)
+                self.logger.info(
+                    "🔍 DRY RUN %s | account=%s (%s) | record=%s | key=%s | %s -> %s",
+                    filename, file_info.account_name, account_id, doclistentry_id,
+                    s3_key, external_s3_url, new_s3_url
+                )
             
             # Update statistics
-            self.migration_stats['successful_migrations'] += 1
-            
-            self.logger.info(f"Successfully migrated file: {filename}")
-            return True
+            self._record('successful_migrations')
+            return None
             
         except Exception as e:
             self.logger.error(f"Error migrating file {filename}: {e}")
             self.logger.error(f"Traceback: {traceback.format_exc()}")
-            self.migration_stats['failed_migrations'] += 1
-            return False
+            self._record('failed_migrations')
+            return None
+    
+    def _apply_url_updates(self, pending_updates: List[Tuple[str, str]]):
+        """Point migrated DocListEntry__c records at their new S3 URLs and count the outcome."""
+        if not pending_updates:
+            return
+        
+        if self.use_bulk_api:
+            results = self.sf_manager.submit_bulk_update(pending_updates)
+        else:
+            results = self.sf_manager.update_doclistentry_urls_bulk(pending_updates)
+        succeeded = sum(results.values())
+        self._record('successful_migrations', succeeded)
+        self._record('failed_migrations', len(results) - succeeded)
     
     def run_migration(self) -> bool:
         """Run the complete migration process."""
@@ -603,12 +1144,12 @@ class MigrationOrchestrator:
                 
                 # If no specific account was provided, use the first account found
                 if not test_account_id and not test_account_name and files_to_migrate:
-                    first_account_id = files_to_migrate[0]['account_id']
-                    first_account_name = files_to_migrate[0]['account_name']
+                    first_account_id = files_to_migrate[0].account_id
+                    first_account_name = files_to_migrate[0].account_name
                     self.logger.info(f"No specific account specified, using first account found: {first_account_name} ({first_account_id})")
                     
                     # Filter files to just this account
-                    files_to_migrate = [f for f in files_to_migrate if f['account_id'] == first_account_id]
+                    files_to_migrate = [f for f in files_to_migrate if f.account_id == first_account_id]
                 
                 # Limit number of files for testing
                 max_test_files = MIGRATION_CONFIG.get('max_test_files', 5)
@@ -617,46 +1158,67 @@ class MigrationOrchestrator:
                     files_to_migrate = files_to_migrate[:max_test_files]
                     
             else:
-                # Get all files to migrate
-                files_to_migrate = self.sf_manager.get_doclistentry_files()
+                # Stream all files to migrate; processing starts with the first account batch
+                files_to_migrate = self.sf_manager.iter_doclistentry_files()
+                self.use_bulk_api = MIGRATION_CONFIG.get('use_bulk_api_for_updates', False)
             
-            if not files_to_migrate:
-                self.logger.warning("No DocListEntry__c files found to migrate")
-                return True
-            
-            self.migration_stats['total_files'] = len(files_to_migrate)
-            self.logger.info(f"Found {len(files_to_migrate)} DocListEntry__c files to process")
-            
-            # Show account summary
-            accounts = {}
-            for file_info in files_to_migrate:
-                account_id = file_info['account_id']
-                account_name = file_info['account_name']
-                if account_id not in accounts:
-                    accounts[account_id] = {'name': account_name, 'file_count': 0}
-                accounts[account_id]['file_count'] += 1
-            
-            self.logger.info(f"Files will be processed for {len(accounts)} account(s):")
-            for account_id, info in accounts.items():
-                self.logger.info(f"  - {info['name']} ({account_id}): {info['file_count']} files")
-            
-            # Get folder structures for all accounts
-            all_folders = {}
-            for account_id in accounts.keys():
-                folders = self.sf_manager.get_folder_structure(account_id)
-                all_folders[account_id] = folders
-                self.logger.info(f"Found {len(folders)} folders for account {accounts[account_id]['name']}")
-            
-            # Process files in batches
+            # Process files concurrently; each file is network-bound (download,
+            # upload, Salesforce update), so threads overlap those latencies.
+            # batch_size now only sets how often progress is logged.
             batch_size = MIGRATION_CONFIG['batch_size']
-            for i in range(0, len(files_to_migrate), batch_size):
-                batch = files_to_migrate[i:i + batch_size]
-                self.logger.info(f"Processing batch {i//batch_size + 1}/{(len(files_to_migrate) + batch_size - 1)//batch_size}")
+            max_workers = MIGRATION_CONFIG.get('max_concurrent_files', 16)
+            self.logger.info(f"Migrating with {max_workers} concurrent workers")
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {}
+                accounts = {}
+                for file_info in files_to_migrate:
+                    account_id = file_info.account_id
+                    if account_id not in accounts:
+                        accounts[account_id] = {'name': file_info.account_name, 'file_count': 0}
+                    accounts[account_id]['file_count'] += 1
+                    
+                    # Folder structures were loaded with the files, so this is a cache hit
+                    folders = self.sf_manager.get_folder_structure(account_id)
+                    futures[executor.submit(self.migrate_file, file_info, folders)] = file_info
+                
+                if not futures:
+                    self.logger.warning("No DocListEntry__c files found to migrate")
+                    return True
+                
+                self.migration_stats['total_files'] = len(futures)
+                self.logger.info(f"Found {len(futures)} DocListEntry__c files to process")
+                
+                # Show account summary
+                self.logger.info(f"Files are being processed for {len(accounts)} account(s):")
+                for account_id, info in accounts.items():
+                    folder_count = len(self.sf_manager.get_folder_structure(account_id))
+                    self.logger.info(f"  - {info['name']} ({account_id}): {info['file_count']} files, {folder_count} folders")
+                
+                # Collections calls take 200 records; Bulk API jobs are submitted
+                # every BULK_UPDATE_BATCH_SIZE files so a crash loses little
+                update_batch_size = BULK_UPDATE_BATCH_SIZE if self.use_bulk_api else COLLECTION_BATCH_SIZE
+                pending_updates = []
+                for completed, future in enumerate(as_completed(futures), 1):
+                    try:
+                        pending_update = future.result()
+                    except Exception as e:
+                        # migrate_file handles its own errors; this only catches the unexpected
+                        self.logger.error(f"Unhandled error migrating {futures[future].name}: {e}")
+                        self._record('failed_migrations')
+                        pending_update = None
+                    
+                    if pending_update:
+                        pending_updates.append(pending_update)
+                    
+                    if len(pending_updates) >= update_batch_size:
+                        self._apply_url_updates(pending_updates)
+                        pending_updates = []
+                    
+                    if completed % batch_size == 0 or completed == len(futures):
+                        self.logger.info(f"Progress: {completed}/{len(futures)} files processed")
                 
-                for file_info in batch:
-                    account_id = file_info['account_id']
-                    folders = all_folders.get(account_id, {})
-                    self.migrate_file(file_info, folders)
+                self._apply_url_updates(pending_updates)
             
             # Print final statistics
             self.print_migration_summary()
@@ -679,6 +1241,9 @@ class MigrationOrchestrator:
         self.logger.info(f"Successful migrations: {stats['successful_migrations']}")
         self.logger.info(f"Failed migrations: {stats['failed_migrations']}")
         self.logger.info(f"Skipped files: {stats['skipped_files']}")
+        for reason, count in self.skip_reasons.most_common():
+            self.logger.info(f"  - {reason}: {count}")
+        self.logger.info(f"Already in our S3 (copy skipped): {stats['already_copied']}")
         self.logger.info(f"Total data migrated: {stats['total_size_mb']:.2f} MB")
         
         if stats['total_files'] > 0:
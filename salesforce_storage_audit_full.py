@@ -18,16 +18,33 @@ Usage:
 python salesforce_storage_audit_full.py
 python salesforce_storage_audit_full.py --export-csv
 python salesforce_storage_audit_full.py --detailed
+python salesforce_storage_audit_full.py --size-distribution   # Row-level file scan via Bulk API 2.0
+python salesforce_storage_audit_full.py --no-cache     # Ignore cached API responses
+python salesforce_storage_audit_full.py --include-system   # Also count Share/History/Feed objects
 """
 
 import sys
 import io
+import os
+import re
+import queue
+import threading
+import json
+import time
+import hashlib
+import heapq
 from datetime import datetime
-from collections import defaultdict
+from bisect import bisect_right
+from collections import defaultdict, Counter
+from itertools import takewhile
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from simple_salesforce import Salesforce
 import csv
 from pathlib import Path
+from urllib.parse import quote_plus
+
+from salesforce_client import restore_cached_session, save_cached_session
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -41,17 +58,83 @@ except ImportError:
     print("❌ Error: config.py not found. Copy config_template.py to config.py and configure.")
     sys.exit(1)
 
+# Concurrent COUNT queries; kept low to stay well under the org's concurrent API limit
+COUNT_QUERY_WORKERS = 6
+
+# Subrequests per Composite batch call (API maximum)
+COMPOSITE_BATCH_SIZE = 25
+
+# Object names per limits/recordCount call (keeps the URL short)
+RECORD_COUNT_BATCH_SIZE = 100
+
+# API responses cached between runs (org data: keep out of version control)
+CACHE_DIR = Path('.sf_audit_cache')
+
+# The org schema rarely changes, so the (large) describe response is kept longer
+DESCRIBE_CACHE_TTL = 24 * 3600
+
+# Generated sibling objects (sharing, field history, feeds, change events) and
+# custom metadata; they don't hold business data, so they're skipped by default
+SYSTEM_OBJECT_PATTERN = re.compile(r'(Share|History|Feed|ChangeEvent|__mdt)$')
+
+# Byte -> MB/GB factors (powers of two, so multiplying gives exactly the quotient)
+INV_MB = 1.0 / (1 << 20)
+INV_GB = 1.0 / (1 << 30)
+
+# Row-level file size buckets: (label, exclusive upper bound in bytes)
+SIZE_BUCKETS = [
+    ('< 100 KB', 100 * 1024),
+    ('100 KB - 1 MB', 1024 * 1024),
+    ('1 MB - 10 MB', 10 * 1024 * 1024),
+    ('10 MB - 100 MB', 100 * 1024 * 1024),
+    ('>= 100 MB', None),
+]
+_SIZE_BUCKET_BOUNDS = [bound for _, bound in SIZE_BUCKETS[:-1]]
+
+# Rows per Bulk API 2.0 result page
+BULK_QUERY_PAGE_SIZE = 200000
+
+# Seconds between Bulk API 2.0 job status checks
+BULK_POLL_INTERVAL = 5
+
+# Give up on (and abort) a Bulk API 2.0 query job still running after this many seconds
+BULK_JOB_TIMEOUT = 60 * 60
+
+# Result pages downloaded at once, and downloaded pages held waiting to be parsed
+BULK_RESULT_WORKERS = 8
+BULK_PAGE_QUEUE_SIZE = 16
+
+# Columns in the objects CSV export
+OBJECT_CSV_FIELDS = ['object_name', 'label', 'type', 'record_count', 'estimated_size_mb']
+
+# Rows written between flushes when streaming the objects CSV
+CSV_FLUSH_ROWS = 500
+
 
 class ComprehensiveStorageAuditor:
     """Complete Salesforce storage audit - analyze EVERYTHING."""
 
-    def __init__(self):
-        """Initialize Salesforce connection."""
+    def __init__(self, cache_ttl=3600, refresh_cache=False, include_system=False):
+        """Initialize Salesforce connection.
+
+        API responses are cached on disk for ``cache_ttl`` seconds so repeat
+        runs (e.g. while iterating on the report) skip the API entirely;
+        ``refresh_cache`` ignores cached responses and stores fresh ones.
+        ``include_system`` also counts objects matching SYSTEM_OBJECT_PATTERN.
+        """
         self.sf = None
+        self.cache_ttl = cache_ttl
+        self.refresh_cache = refresh_cache
+        self.include_system = include_system
+        self.export_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.objects_csv = None
+        self._total_records = 0
+        self._total_size_mb = 0.0
         self.all_results = {
             'objects': [],
             'file_storage': {},
             'file_types': [],
+            'size_distribution': [],
             'limits': None,
             'timestamp': datetime.now().isoformat()
         }
@@ -59,6 +142,10 @@ class ComprehensiveStorageAuditor:
 
     def connect_salesforce(self):
         """Connect to Salesforce API."""
+        if self._restore_cached_session():
+            print("✅ Connected to Salesforce (reusing cached session)")
+            return
+
         try:
             sf_config = config.SALESFORCE_CONFIG
             self.sf = Salesforce(
@@ -68,16 +155,77 @@ class ComprehensiveStorageAuditor:
                 domain=sf_config['domain']
             )
             print("✅ Connected to Salesforce")
+            self._save_cached_session()
         except Exception as e:
             print(f"❌ Failed to connect to Salesforce: {e}")
             sys.exit(1)
 
+    def _restore_cached_session(self):
+        """Reuse a still-valid session from a previous run instead of logging in again."""
+        sf = restore_cached_session(config.SALESFORCE_CONFIG['username'],
+                                    config.MIGRATION_CONFIG.get('session_cache_ttl_seconds', 3600))
+        if sf is None:
+            return False
+        self.sf = sf
+        return True
+
+    def _save_cached_session(self):
+        """Store the current session so the next run can skip authentication."""
+        save_cached_session(self.sf, config.SALESFORCE_CONFIG['username'],
+                            config.MIGRATION_CONFIG.get('session_cache_ttl_seconds', 3600))
+
+    def _cache_path(self, endpoint, args, kwargs):
+        """Cache file for an API call: sha1 of org instance, endpoint and arguments."""
+        key = json.dumps([self.sf.sf_instance, endpoint, args, kwargs], sort_keys=True, default=str)
+        return CACHE_DIR / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def _cache_get(self, path, ttl=None):
+        """Return a cached response, or None if missing or older than ``ttl`` (default: the cache TTL)."""
+        if ttl is None:
+            ttl = self.cache_ttl
+        try:
+            if time.time() - path.stat().st_mtime > ttl:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_put(self, path, value):
+        """Store a response; written to a temp file first so readers never see a partial file."""
+        try:
+            CACHE_DIR.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def cached_call(self, endpoint, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)`` through the on-disk response cache."""
+        path = self._cache_path(endpoint, args, kwargs)
+        value = None if self.refresh_cache else self._cache_get(path)
+        if value is None:
+            value = fn(*args, **kwargs)
+            self._cache_put(path, value)
+        return value
+
+    def _cached_describe(self):
+        """Global describe, reused from the cache for up to DESCRIBE_CACHE_TTL."""
+        path = self._cache_path('describe', (), {})
+        describe = None if self.refresh_cache else self._cache_get(path, max(self.cache_ttl, DESCRIBE_CACHE_TTL))
+        if describe is None:
+            describe = self.sf.describe()
+            self._cache_put(path, describe)
+        return describe
+
     def get_org_limits(self):
         """Get ALL organization limits using REST API and Tooling API."""
         print("📊 Retrieving organization limits...")
         try:
             # Try standard limits() API first
-            limits = self.sf.limits()
+            limits = self.cached_call('limits', self.sf.limits)
 
             # If storage data is zero/missing, query Organization object directly
             data_storage = limits.get('DataStorageMB', {})
@@ -94,7 +242,7 @@ class ComprehensiveStorageAuditor:
                             OrganizationType
                         FROM Organization
                     """
-                    org_result = self.sf.query(org_query)
+                    org_result = self.cached_call('query', self.sf.query, org_query)
 
                     if org_result['records']:
                         org_info = org_result['records'][0]
@@ -130,68 +278,39 @@ class ComprehensiveStorageAuditor:
             traceback.print_exc()
             return None
 
-    def analyze_all_objects(self):
-        """Analyze EVERY object in the org - no limits."""
+    def analyze_all_objects(self, on_row=None):
+        """Analyze EVERY object in the org - no limits.
+
+        ``on_row`` is called with each object's row as soon as it's counted,
+        so exports can write rows out while the remaining counts run.
+        """
         print("\n🔍 ANALYZING ALL OBJECTS IN ORG...")
         print("   This will take several minutes for large orgs...")
         print()
 
         try:
-            # Get all objects
-            describe = self.sf.describe()
-            all_objects = describe['sobjects']
-
-            total_objects = len(all_objects)
-            processed = 0
-
-            print(f"   Found {total_objects} total objects")
-            print(f"   Querying record counts for each object...")
-            print()
-
             object_data = []
+            self._total_records = 0
+            self._total_size_mb = 0.0
 
-            for obj in all_objects:
-                obj_name = obj['name']
-                obj_label = obj['label']
-                obj_type = 'Custom' if obj['custom'] else 'Standard'
-
-                processed += 1
-
-                # Progress indicator
-                if processed % 50 == 0:
-                    print(f"   Progress: {processed}/{total_objects} objects processed...")
-
-                try:
-                    # Count records
-                    query = f"SELECT COUNT(Id) total FROM {obj_name}"
-                    result = self.sf.query(query)
-                    count = result['records'][0]['total']
-
-                    # Estimate size (conservative: 2KB per record for data storage)
-                    estimated_size_bytes = count * 2048
-
-                    object_data.append({
-                        'object_name': obj_name,
-                        'label': obj_label,
-                        'type': obj_type,
-                        'record_count': count,
-                        'estimated_size_bytes': estimated_size_bytes,
-                        'estimated_size_mb': estimated_size_bytes / (1024 * 1024),
-                        'queryable': obj.get('queryable', False),
-                        'deletable': obj.get('deletable', False),
-                        'updateable': obj.get('updateable', False)
-                    })
-
-                except Exception as e:
-                    # Skip objects that can't be queried
-                    continue
+            # Totals are kept as rows arrive rather than summed in the report
+            for row in self.iter_objects():
+                self._total_records += row['record_count']
+                self._total_size_mb += row['estimated_size_mb']
+                if on_row:
+                    on_row(row)
+                object_data.append(row)
 
             # Sort by record count descending
             object_data.sort(key=lambda x: x['record_count'], reverse=True)
 
+            # Report column, filled in once the total is known
+            for row in object_data:
+                row['pct_of_records'] = (row['record_count'] / self._total_records * 100) if self._total_records > 0 else 0
+
             print(f"\n   ✅ Analyzed {len(object_data)} queryable objects")
-            print(f"   📊 Found {sum(o['record_count'] for o in object_data):,} total records")
-            print(f"   💾 Estimated total data storage: {sum(o['estimated_size_mb'] for o in object_data):,.2f} MB")
+            print(f"   📊 Found {self._total_records:,} total records")
+            print(f"   💾 Estimated total data storage: {self._total_size_mb:,.2f} MB")
 
             self.all_results['objects'] = object_data
             return object_data
@@ -202,6 +321,138 @@ class ComprehensiveStorageAuditor:
             traceback.print_exc()
             return []
 
+    def iter_objects(self):
+        """Yield a report row for every queryable object, in the order counts arrive."""
+        # Get all objects
+        describe = self._cached_describe()
+        sobjects = describe['sobjects']
+
+        # Don't spend a round-trip on objects that can't be (or needn't be) counted
+        all_objects = [
+            obj for obj in sobjects
+            if obj.get('queryable', False)
+            and (self.include_system or not SYSTEM_OBJECT_PATTERN.search(obj['name']))
+        ]
+
+        total_objects = len(all_objects)
+
+        print(f"   Found {len(sobjects)} total objects ({len(sobjects) - total_objects} non-queryable/system skipped)")
+        print(f"   Querying record counts for each object...")
+        print()
+
+        # Most counts come from the recordCount endpoint, 100 objects per
+        # call; objects it doesn't report (or whose call failed) get a COUNT query
+        record_counts = self.get_record_counts(all_objects)
+        processed = 0
+        for obj in all_objects:
+            if obj['name'] in record_counts:
+                processed += 1
+                yield self._object_row(obj, record_counts[obj['name']])
+        print(f"   {processed} counts from the recordCount API; querying the rest ({total_objects - processed})...")
+        remaining = [obj for obj in all_objects if obj['name'] not in record_counts]
+
+        # 25 COUNTs per Composite batch call, several calls in flight at once
+        batches = [remaining[i:i + COMPOSITE_BATCH_SIZE]
+                   for i in range(0, len(remaining), COMPOSITE_BATCH_SIZE)]
+        next_progress = (processed // 50 + 1) * 50
+
+        with ThreadPoolExecutor(max_workers=COUNT_QUERY_WORKERS) as executor:
+            futures = {executor.submit(self.count_object_batch, batch): batch for batch in batches}
+
+            for future in as_completed(futures):
+                processed += len(futures[future])
+
+                # Progress indicator
+                if processed >= next_progress:
+                    print(f"   Progress: {processed}/{total_objects} objects processed...")
+                    next_progress = (processed // 50 + 1) * 50
+
+                yield from future.result()
+
+    def get_record_counts(self, objs):
+        """Get record counts from the limits/recordCount endpoint.
+
+        One call covers 100 objects and uses no query rows. Counts come from
+        Salesforce's storage statistics, so they can lag very recent changes.
+        Objects the endpoint doesn't report, or whose call failed, are left
+        out of the result so the caller counts them with a query.
+        """
+        counts = {}
+        names = [obj['name'] for obj in objs]
+
+        for i in range(0, len(names), RECORD_COUNT_BATCH_SIZE):
+            batch = names[i:i + RECORD_COUNT_BATCH_SIZE]
+            try:
+                response = self.cached_call('restful', self.sf.restful, 'limits/recordCount', params={'sObjects': ','.join(batch)})
+            except Exception as e:
+                print(f"   ⚠️  recordCount API failed, falling back to COUNT queries: {e}")
+                continue
+            for entry in response.get('sObjects', []):
+                counts[entry['name']] = entry['count']
+
+        return counts
+
+    def count_object_batch(self, objs):
+        """Count records for up to 25 objects in one Composite batch request.
+
+        Objects whose subrequest fails are retried with a single query, which
+        skips them if they really can't be queried.
+        """
+        batch_requests = [
+            {
+                'method': 'GET',
+                'url': f"v{self.sf.sf_version}/query?q=" + quote_plus(f"SELECT COUNT(Id) total FROM {obj['name']}")
+            }
+            for obj in objs
+        ]
+
+        try:
+            response = self.cached_call('restful', self.sf.restful, 'composite/batch', method='POST', json={'batchRequests': batch_requests})
+        except Exception:
+            # Whole batch failed; count the objects one by one
+            rows = (self.count_object_records(obj) for obj in objs)
+            return [row for row in rows if row is not None]
+
+        rows = []
+        for obj, result in zip(objs, response['results']):
+            if result['statusCode'] >= 400:
+                row = self.count_object_records(obj)
+            else:
+                row = self._object_row(obj, result['result']['records'][0]['total'])
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def count_object_records(self, obj):
+        """Count one object's records; returns None for objects that can't be queried."""
+        try:
+            # Count records
+            query = f"SELECT COUNT(Id) total FROM {obj['name']}"
+            result = self.cached_call('query', self.sf.query, query)
+            count = result['records'][0]['total']
+        except Exception:
+            # Skip objects that can't be queried
+            return None
+
+        return self._object_row(obj, count)
+
+    def _object_row(self, obj, count):
+        """Build the report row for an object with ``count`` records."""
+        # Estimate size (conservative: 2KB per record for data storage)
+        estimated_size_bytes = count * 2048
+
+        return {
+            'object_name': obj['name'],
+            'label': obj['label'],
+            'type': 'Custom' if obj['custom'] else 'Standard',
+            'record_count': count,
+            'estimated_size_bytes': estimated_size_bytes,
+            'estimated_size_mb': estimated_size_bytes * INV_MB,
+            'queryable': obj.get('queryable', False),
+            'deletable': obj.get('deletable', False),
+            'updateable': obj.get('updateable', False)
+        }
+
     def analyze_file_storage_complete(self):
         """Analyze ALL file storage - complete breakdown."""
         print("\n📁 ANALYZING FILE STORAGE (COMPLETE)...")
@@ -216,18 +467,19 @@ class ComprehensiveStorageAuditor:
                 FROM ContentVersion
                 WHERE IsLatest = true
             """
-            cv_result = self.sf.query(cv_query)
+            cv_result = self.cached_call('query', self.sf.query, cv_query)
             if cv_result['records']:
                 record = cv_result['records'][0]
                 count = record['record_count'] or 0
                 size = record['total_size'] or 0
+                size_mb = size * INV_MB
                 file_storage['ContentVersion'] = {
                     'count': count,
                     'size_bytes': size,
-                    'size_mb': size / (1024 * 1024),
-                    'size_gb': size / (1024 * 1024 * 1024)
+                    'size_mb': size_mb,
+                    'size_gb': size_mb / 1024
                 }
-                print(f"      ✅ {count:,} records, {size / (1024 * 1024 * 1024):.2f} GB")
+                print(f"      ✅ {count:,} records, {size_mb / 1024:.2f} GB")
         except Exception as e:
             print(f"      ❌ Failed: {e}")
 
@@ -238,18 +490,19 @@ class ComprehensiveStorageAuditor:
                 SELECT COUNT(Id) record_count, SUM(BodyLength) total_size
                 FROM Attachment
             """
-            att_result = self.sf.query(att_query)
+            att_result = self.cached_call('query', self.sf.query, att_query)
             if att_result['records']:
                 record = att_result['records'][0]
                 count = record['record_count'] or 0
                 size = record['total_size'] or 0
+                size_mb = size * INV_MB
                 file_storage['Attachment'] = {
                     'count': count,
                     'size_bytes': size,
-                    'size_mb': size / (1024 * 1024),
-                    'size_gb': size / (1024 * 1024 * 1024)
+                    'size_mb': size_mb,
+                    'size_gb': size_mb / 1024
                 }
-                print(f"      ✅ {count:,} records, {size / (1024 * 1024 * 1024):.2f} GB")
+                print(f"      ✅ {count:,} records, {size_mb / 1024:.2f} GB")
         except Exception as e:
             print(f"      ❌ Failed: {e}")
 
@@ -260,24 +513,30 @@ class ComprehensiveStorageAuditor:
                 SELECT COUNT(Id) record_count, SUM(BodyLength) total_size
                 FROM Document
             """
-            doc_result = self.sf.query(doc_query)
+            doc_result = self.cached_call('query', self.sf.query, doc_query)
             if doc_result['records']:
                 record = doc_result['records'][0]
                 count = record['record_count'] or 0
                 size = record['total_size'] or 0
+                size_mb = size * INV_MB
                 file_storage['Document'] = {
                     'count': count,
                     'size_bytes': size,
-                    'size_mb': size / (1024 * 1024),
-                    'size_gb': size / (1024 * 1024 * 1024)
+                    'size_mb': size_mb,
+                    'size_gb': size_mb / 1024
                 }
-                print(f"      ✅ {count:,} records, {size / (1024 * 1024 * 1024):.2f} GB")
+                print(f"      ✅ {count:,} records, {size_mb / 1024:.2f} GB")
         except Exception as e:
             print(f"      ❌ Failed: {e}")
 
         total_file_size_gb = sum(f['size_gb'] for f in file_storage.values())
         print(f"\n   ✅ Total File Storage: {total_file_size_gb:.2f} GB")
 
+        # Report columns
+        for data in file_storage.values():
+            data['avg_size_fmt'] = self.format_size(data['size_bytes'] / data['count'] if data['count'] > 0 else 0)
+            data['pct_of_total'] = (data['size_gb'] / total_file_size_gb * 100) if total_file_size_gb > 0 else 0
+
         self.all_results['file_storage'] = file_storage
         return file_storage
 
@@ -294,7 +553,7 @@ class ComprehensiveStorageAuditor:
                 ORDER BY SUM(ContentSize) DESC
             """
 
-            result = self.sf.query(query)
+            result = self.cached_call('query', self.sf.query, query)
             file_types = result['records']
 
             # Format data
@@ -303,16 +562,23 @@ class ComprehensiveStorageAuditor:
                 ext = record['FileExtension'] or '(no extension)'
                 count = record['record_count'] or 0
                 size = record['total_size'] or 0
+                size_mb = size * INV_MB
 
                 formatted_types.append({
                     'extension': ext,
                     'count': count,
                     'size_bytes': size,
-                    'size_mb': size / (1024 * 1024),
-                    'size_gb': size / (1024 * 1024 * 1024),
+                    'size_mb': size_mb,
+                    'size_gb': size_mb / 1024,
                     'avg_size_bytes': size / count if count > 0 else 0
                 })
 
+            # Report columns
+            total_size_gb = sum(ft['size_gb'] for ft in formatted_types)
+            for ft in formatted_types:
+                ft['avg_size_fmt'] = self.format_size(ft['avg_size_bytes'])
+                ft['pct_of_total'] = (ft['size_gb'] / total_size_gb * 100) if total_size_gb > 0 else 0
+
             print(f"   ✅ Found {len(formatted_types)} unique file types")
 
             self.all_results['file_types'] = formatted_types
@@ -322,6 +588,165 @@ class ComprehensiveStorageAuditor:
             print(f"❌ Failed: {e}")
             return []
 
+    def analyze_file_size_distribution(self):
+        """Bucket every current ContentVersion by size.
+
+        This is a row-level scan, so it goes through Bulk API 2.0: it's much
+        faster than REST query paging for large extractions and has its own
+        limits. Result pages download in parallel and rows are tallied as
+        each CSV page arrives.
+        """
+        print("\n📏 ANALYZING FILE SIZE DISTRIBUTION (Bulk API 2.0)...")
+
+        query = "SELECT ContentSize FROM ContentVersion WHERE IsLatest = true"
+        bucket_counts = Counter()
+        bucket_sizes = defaultdict(int)
+
+        try:
+            for page in self._bulk_query_pages(query):
+                for row in csv.DictReader(io.StringIO(page)):
+                    size = int(row['ContentSize'] or 0)
+                    label = SIZE_BUCKETS[bisect_right(_SIZE_BUCKET_BOUNDS, size)][0]
+                    bucket_counts[label] += 1
+                    bucket_sizes[label] += size
+        except Exception as e:
+            print(f"❌ Failed: {e}")
+            return []
+
+        total_count = sum(bucket_counts.values())
+        distribution = []
+        for label, _ in SIZE_BUCKETS:
+            count = bucket_counts[label]
+            size = bucket_sizes[label]
+            distribution.append({
+                'bucket': label,
+                'count': count,
+                'size_bytes': size,
+                'size_gb': size * INV_GB,
+                'pct_of_files': (count / total_count * 100) if total_count > 0 else 0
+            })
+
+        print(f"   ✅ Scanned {total_count:,} files")
+
+        self.all_results['size_distribution'] = distribution
+        return distribution
+
+    def _bulk_query_pages(self, query):
+        """Run ``query`` as a Bulk API 2.0 query job and yield each CSV result page.
+
+        Pages are listed through the resultPages endpoint and downloaded by
+        several workers at once. The bounded queue holds at most
+        BULK_PAGE_QUEUE_SIZE pages while the caller parses them.
+        """
+        job = self.sf.restful('jobs/query', method='POST', json={'operation': 'query', 'query': query})
+        self._wait_for_bulk_job(job['id'])
+
+        try:
+            links = self._bulk_result_links(job['id'])
+        except Exception:
+            # resultPages isn't available on every API version; follow locators one page at a time
+            yield from self._bulk_result_pages_sequential(job['id'])
+            return
+
+        pages = queue.Queue(maxsize=BULK_PAGE_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def fetch(link):
+            try:
+                item = self._instance_get(link, headers={'Accept': 'text/csv'}).text
+            except Exception as e:
+                item = e
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        with ThreadPoolExecutor(max_workers=BULK_RESULT_WORKERS) as executor:
+            futures = [executor.submit(fetch, link) for link in links]
+            try:
+                for _ in links:
+                    item = pages.get()
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                # On error or early exit: drop downloads not yet started and let
+                # workers waiting on a full queue exit, so shutdown doesn't wait
+                # for every remaining page
+                for future in futures:
+                    future.cancel()
+                stop.set()
+
+    def _wait_for_bulk_job(self, job_id):
+        """Poll a Bulk API 2.0 query job until it has finished.
+
+        The job is aborted if it is still running after BULK_JOB_TIMEOUT
+        seconds, or if polling fails or is interrupted, so it doesn't keep
+        running on the org.
+        """
+        deadline = time.monotonic() + BULK_JOB_TIMEOUT
+        try:
+            while True:
+                job = self.sf.restful(f'jobs/query/{job_id}')
+                if job['state'] in ('JobComplete', 'Failed', 'Aborted'):
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Bulk query job {job_id} still {job['state']} after {BULK_JOB_TIMEOUT}s")
+                time.sleep(BULK_POLL_INTERVAL)
+        except BaseException:
+            # BaseException so Ctrl-C aborts the job too
+            self._abort_bulk_job(job_id)
+            raise
+
+        if job['state'] != 'JobComplete':
+            raise RuntimeError(f"Bulk query job {job_id} {job['state']}: {job.get('errorMessage')}")
+        return job
+
+    def _abort_bulk_job(self, job_id):
+        """Abort a Bulk API 2.0 query job so it doesn't keep running on the org."""
+        try:
+            self.sf.restful(f'jobs/query/{job_id}', method='PATCH', json={'state': 'Aborted'})
+            print(f"   Aborted Bulk query job {job_id}")
+        except Exception as e:
+            print(f"   ⚠️  Could not abort Bulk query job {job_id}: {e}")
+
+    def _bulk_result_links(self, job_id):
+        """List the result page links of a completed query job."""
+        links = []
+        response = self.sf.restful(f'jobs/query/{job_id}/resultPages', params={'maxRecords': BULK_QUERY_PAGE_SIZE})
+        while True:
+            links.extend(page['resultLink'] for page in response['resultPages'])
+            if response.get('done', True) or not response.get('nextRecordsUrl'):
+                return links
+            response = self._instance_get(response['nextRecordsUrl']).json()
+
+    def _bulk_result_pages_sequential(self, job_id):
+        """Yield a query job's CSV result pages by following the Sforce-Locator header."""
+        locator = None
+        while locator != 'null':
+            params = {'maxRecords': BULK_QUERY_PAGE_SIZE}
+            if locator:
+                params['locator'] = locator
+            response = self._instance_get(
+                f'/services/data/v{self.sf.sf_version}/jobs/query/{job_id}/results',
+                params=params,
+                headers={'Accept': 'text/csv'}
+            )
+            yield response.text
+            locator = response.headers.get('Sforce-Locator', 'null')
+
+    def _instance_get(self, path, params=None, headers=None):
+        """GET an instance-relative URL (``/services/data/...``) with the session's auth headers."""
+        response = self.sf.session.get(
+            f"https://{self.sf.sf_instance}{path}",
+            params=params,
+            headers={**self.sf.headers, **(headers or {})}
+        )
+        response.raise_for_status()
+        return response
+
     def format_size(self, size_bytes):
         """Format bytes to human readable."""
         if size_bytes == 0:
@@ -350,6 +775,8 @@ class ComprehensiveStorageAuditor:
 
         self.print_file_storage_report()
         self.print_file_type_report()
+        if self.all_results.get('size_distribution'):
+            self.print_size_distribution_report()
         self.print_object_report()
         self.print_storage_impact_analysis()
 
@@ -408,22 +835,19 @@ class ComprehensiveStorageAuditor:
             print("No file storage data available")
             return
 
-        print(f"\n{'Type':<20} {'Count':<15} {'Total Size (GB)':<20} {'Avg Size':<20} {'% of Total':<15}")
-        print("-" * 120)
+        buf = io.StringIO()
+        print(f"\n{'Type':<20} {'Count':<15} {'Total Size (GB)':<20} {'Avg Size':<20} {'% of Total':<15}", file=buf)
+        print("-" * 120, file=buf)
 
         total_size = sum(f['size_gb'] for f in file_storage.values())
 
         for storage_type, data in sorted(file_storage.items(), key=lambda x: x[1]['size_gb'], reverse=True):
-            count = data['count']
-            size_gb = data['size_gb']
-            avg_size = data['size_bytes'] / count if count > 0 else 0
-            pct = (size_gb / total_size * 100) if total_size > 0 else 0
+            print(f"{storage_type:<20} {data['count']:<15,} {data['size_gb']:<20.2f} {data['avg_size_fmt']:<20} {data['pct_of_total']:<15.1f}%", file=buf)
 
-            print(f"{storage_type:<20} {count:<15,} {size_gb:<20.2f} {self.format_size(avg_size):<20} {pct:<15.1f}%")
-
-        print("-" * 120)
-        print(f"{'TOTAL':<20} {sum(f['count'] for f in file_storage.values()):<15,} {total_size:<20.2f} {'':<20} {'100.0':<15}%")
-        print()
+        print("-" * 120, file=buf)
+        print(f"{'TOTAL':<20} {sum(f['count'] for f in file_storage.values()):<15,} {total_size:<20.2f} {'':<20} {'100.0':<15}%", file=buf)
+        print(file=buf)
+        sys.stdout.write(buf.getvalue())
 
     def print_file_type_report(self):
         """Print ALL file types."""
@@ -436,21 +860,30 @@ class ComprehensiveStorageAuditor:
             print("No file type data available")
             return
 
-        print(f"\n{'Extension':<15} {'Count':<15} {'Total Size (GB)':<20} {'Avg Size':<20} {'% of Total':<15}")
-        print("-" * 120)
-
-        total_size = sum(f['size_gb'] for f in file_types)
+        buf = io.StringIO()
+        print(f"\n{'Extension':<15} {'Count':<15} {'Total Size (GB)':<20} {'Avg Size':<20} {'% of Total':<15}", file=buf)
+        print("-" * 120, file=buf)
 
         for ft in file_types:  # ALL file types, no limit
-            ext = ft['extension']
-            count = ft['count']
-            size_gb = ft['size_gb']
-            avg_size = ft['avg_size_bytes']
-            pct = (size_gb / total_size * 100) if total_size > 0 else 0
+            print(f"{ft['extension']:<15} {ft['count']:<15,} {ft['size_gb']:<20.2f} {ft['avg_size_fmt']:<20} {ft['pct_of_total']:<15.2f}%", file=buf)
 
-            print(f"{ext:<15} {count:<15,} {size_gb:<20.2f} {self.format_size(avg_size):<20} {pct:<15.2f}%")
+        print(file=buf)
+        sys.stdout.write(buf.getvalue())
 
-        print()
+    def print_size_distribution_report(self):
+        """Print the file size distribution."""
+        print("\n📏 FILE SIZE DISTRIBUTION (ContentVersion)")
+        print("-" * 120)
+
+        buf = io.StringIO()
+        print(f"\n{'Size':<20} {'Files':<15} {'Total Size (GB)':<20} {'% of Files':<15}", file=buf)
+        print("-" * 120, file=buf)
+
+        for bucket in self.all_results['size_distribution']:
+            print(f"{bucket['bucket']:<20} {bucket['count']:<15,} {bucket['size_gb']:<20.2f} {bucket['pct_of_files']:<15.1f}%", file=buf)
+
+        print(file=buf)
+        sys.stdout.write(buf.getvalue())
 
     def print_object_report(self):
         """Print ALL objects with records."""
@@ -463,26 +896,24 @@ class ComprehensiveStorageAuditor:
             print("No object data available")
             return
 
-        # Filter to only objects with records
-        objects_with_records = [o for o in objects if o['record_count'] > 0]
+        # Objects are sorted by record count, so the ones with records come first
+        objects_with_records = takewhile(lambda o: o['record_count'] > 0, objects)
 
-        print(f"\n{'Object Name':<40} {'Type':<10} {'Records':<15} {'Est. Size (MB)':<20} {'% of Total Records':<20}")
-        print("-" * 120)
+        # Thousands of rows: build the table and write it to the console once
+        buf = io.StringIO()
+        print(f"\n{'Object Name':<40} {'Type':<10} {'Records':<15} {'Est. Size (MB)':<20} {'% of Total Records':<20}", file=buf)
+        print("-" * 120, file=buf)
 
-        total_records = sum(o['record_count'] for o in objects_with_records)
+        # Objects without records add nothing, so the running totals apply as-is
+        total_records = self._total_records
 
         for obj in objects_with_records:  # ALL objects, no limit
-            name = obj['object_name']
-            obj_type = obj['type']
-            count = obj['record_count']
-            size_mb = obj['estimated_size_mb']
-            pct = (count / total_records * 100) if total_records > 0 else 0
-
-            print(f"{name:<40} {obj_type:<10} {count:<15,} {size_mb:<20.2f} {pct:<20.2f}%")
+            print(f"{obj['object_name']:<40} {obj['type']:<10} {obj['record_count']:<15,} {obj['estimated_size_mb']:<20.2f} {obj['pct_of_records']:<20.2f}%", file=buf)
 
-        print("-" * 120)
-        print(f"{'TOTAL':<40} {'':<10} {total_records:<15,} {sum(o['estimated_size_mb'] for o in objects_with_records):<20.2f} {'100.0':<20}%")
-        print()
+        print("-" * 120, file=buf)
+        print(f"{'TOTAL':<40} {'':<10} {total_records:<15,} {self._total_size_mb:<20.2f} {'100.0':<20}%", file=buf)
+        print(file=buf)
+        sys.stdout.write(buf.getvalue())
 
     def print_storage_impact_analysis(self):
         """Analyze what's causing storage issues."""
@@ -506,7 +937,7 @@ class ComprehensiveStorageAuditor:
                 print()
                 print("   TOP 10 DATA CONSUMERS:")
 
-                top_objects = sorted(objects, key=lambda x: x['record_count'], reverse=True)[:10]
+                top_objects = heapq.nlargest(10, objects, key=lambda x: x['record_count'])
                 for i, obj in enumerate(top_objects, 1):
                     print(f"   {i}. {obj['object_name']}: {obj['record_count']:,} records (~{obj['estimated_size_mb']:.2f} MB)")
                 print()
@@ -528,7 +959,7 @@ class ComprehensiveStorageAuditor:
                 print()
                 print("   TOP 10 FILE TYPE CONSUMERS:")
 
-                top_types = sorted(file_types, key=lambda x: x['size_gb'], reverse=True)[:10]
+                top_types = heapq.nlargest(10, file_types, key=lambda x: x['size_gb'])
                 for i, ft in enumerate(top_types, 1):
                     print(f"   {i}. {ft['extension']}: {ft['count']:,} files, {ft['size_gb']:.2f} GB")
                 print()
@@ -553,6 +984,32 @@ class ComprehensiveStorageAuditor:
             print("   4. 📦 Consider Big Objects for historical data")
             print()
 
+    def analyze_objects_to_csv(self, output_dir="storage_audit_export"):
+        """Analyze all objects, writing each row to the objects CSV as it's counted.
+
+        Rows are in the order counts arrive rather than sorted by record count.
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(exist_ok=True)
+
+        objects_file = output_path / f"objects_{self.export_timestamp}.csv"
+        with open(objects_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=OBJECT_CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            rows_written = 0
+
+            def write_row(row):
+                nonlocal rows_written
+                writer.writerow(row)
+                rows_written += 1
+                if rows_written % CSV_FLUSH_ROWS == 0:
+                    f.flush()
+
+            object_data = self.analyze_all_objects(on_row=write_row)
+
+        self.objects_csv = objects_file
+        return object_data
+
     def export_to_csv(self, output_dir="storage_audit_export"):
         """Export all results to CSV files."""
         print(f"\n📤 EXPORTING RESULTS TO CSV...")
@@ -560,20 +1017,23 @@ class ComprehensiveStorageAuditor:
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-        # Export objects
-        objects_file = output_path / f"objects_{timestamp}.csv"
-        with open(objects_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['object_name', 'label', 'type', 'record_count', 'estimated_size_mb'])
-            writer.writeheader()
-            writer.writerows(self.all_results['objects'])
+        timestamp = self.export_timestamp
+
+        # Export objects (already written if they were streamed during analysis)
+        objects_file = self.objects_csv
+        if objects_file is None:
+            objects_file = output_path / f"objects_{timestamp}.csv"
+            with open(objects_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=OBJECT_CSV_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                for row in self.all_results['objects']:
+                    writer.writerow(row)
         print(f"   ✅ Objects exported to: {objects_file}")
 
         # Export file types
         file_types_file = output_path / f"file_types_{timestamp}.csv"
         with open(file_types_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['extension', 'count', 'size_gb', 'avg_size_bytes'])
+            writer = csv.DictWriter(f, fieldnames=['extension', 'count', 'size_gb', 'avg_size_bytes'], extrasaction='ignore')
             writer.writeheader()
             writer.writerows(self.all_results['file_types'])
         print(f"   ✅ File types exported to: {file_types_file}")
@@ -587,6 +1047,16 @@ class ComprehensiveStorageAuditor:
                 writer.writerow([storage_type, data['count'], data['size_gb']])
         print(f"   ✅ File storage exported to: {file_storage_file}")
 
+        # Export size distribution
+        if self.all_results['size_distribution']:
+            size_distribution_file = output_path / f"size_distribution_{timestamp}.csv"
+            with open(size_distribution_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['bucket', 'count', 'size_gb'], extrasaction='ignore')
+                writer.writeheader()
+                for row in self.all_results['size_distribution']:
+                    writer.writerow(row)
+            print(f"   ✅ Size distribution exported to: {size_distribution_file}")
+
         print(f"\n   📁 All exports saved to: {output_path.absolute()}")
 
 
@@ -605,6 +1075,27 @@ def main():
         action='store_true',
         help='Show detailed analysis (same as default)'
     )
+    parser.add_argument(
+        '--size-distribution',
+        action='store_true',
+        help='Also scan every file (Bulk API 2.0) and report the size distribution'
+    )
+    parser.add_argument(
+        '--include-system',
+        action='store_true',
+        help='Also count Share/History/Feed/ChangeEvent objects and custom metadata'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=int,
+        default=3600,
+        help='Reuse cached API responses younger than this many seconds (default: 3600)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore cached API responses and query Salesforce again (refreshes the cache)'
+    )
 
     args = parser.parse_args()
 
@@ -616,16 +1107,25 @@ def main():
     print("   Estimated time: 5-15 minutes for large orgs")
     print()
 
-    auditor = ComprehensiveStorageAuditor()
+    auditor = ComprehensiveStorageAuditor(
+        cache_ttl=args.cache_ttl,
+        refresh_cache=args.no_cache,
+        include_system=args.include_system
+    )
 
     try:
         # Get limits first
         auditor.get_org_limits()
 
-        # Analyze everything
-        auditor.analyze_all_objects()
+        # Analyze everything; with --export-csv, object rows go to disk as they're counted
+        if args.export_csv:
+            auditor.analyze_objects_to_csv()
+        else:
+            auditor.analyze_all_objects()
         auditor.analyze_file_storage_complete()
         auditor.analyze_all_file_types()
+        if args.size_distribution:
+            auditor.analyze_file_size_distribution()
 
         # Print complete report
         auditor.print_complete_report()
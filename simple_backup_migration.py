@@ -501,8 +501,12 @@ class SimpleBackupMigration:
         s3_key = f"uploads/{account_id}/{clean_account_name}/{safe_filename}"
         return s3_key
     
-    def backup_file(self, file_info: Dict) -> bool:
-        """Backup a single file to S3."""
+    def backup_file(self, file_info: Dict, pending_rows: List[Dict]) -> bool:
+        """Backup a single file to S3.
+        
+        The file's database record is appended to ``pending_rows`` rather
+        than written, so no write lock is held during the batch's transfers.
+        """
         try:
             filename = file_info['name']
             doclistentry_id = file_info['doclistentry_id']
@@ -548,7 +552,7 @@ class SimpleBackupMigration:
                     return False
                 
                 # Record in database
-                file_hash = calculate_file_hash(file_content)
+                file_hash = calculate_file_hash(file_content, MIGRATION_CONFIG.get("hash_algorithm", "sha256"))
                 file_data = {
                     'doclist_entry_id': doclistentry_id,
                     'account_id': account_id,
@@ -563,7 +567,7 @@ class SimpleBackupMigration:
                     'last_modified_sf': file_info.get('last_modified_date')
                 }
                 
-                self.db.record_file_migration(file_data)
+                pending_rows.append(file_data)
                 self.stats['total_size_mb'] += len(file_content) / (1024 * 1024)
                 
             else:
@@ -666,11 +670,18 @@ class SimpleBackupMigration:
                 
                 self.logger.info(f"📦 Processing batch {batch_num}/{total_batches} ({len(batch)} files)")
                 
-                for file_info in batch:
-                    self.backup_file(file_info)
-                
-                # Update database stats
-                self.db.update_run_stats(self.run_id, **self.stats)
+                # Transfers first; the batch's rows are then written in one
+                # short transaction (also if the batch is interrupted)
+                pending_rows = []
+                try:
+                    for file_info in batch:
+                        self.backup_file(file_info, pending_rows)
+                finally:
+                    with self.db.transaction():
+                        self.db.record_file_migrations(pending_rows)
+                        self.db.update_run_stats(self.run_id, **self.stats)
+                    # Commits a transaction opened earlier by a buffered-error write, if the block above joined it
+                    self.db.flush()
                 
                 # Progress update
                 progress = (i + len(batch)) / len(files_to_backup) * 100
@@ -683,6 +694,7 @@ class SimpleBackupMigration:
             # Update final run stats
             self.db.update_run_stats(self.run_id, **self.stats)
             self.db.end_migration_run(self.run_id, 'completed')
+            self.db.analyze()
             
             return True
             
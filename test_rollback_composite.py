@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test Rollback Composite Requests
+================================
+
+Check that rollback updates are split into Composite API requests that
+Salesforce accepts (at most 5 sObject Collections subrequests per call) and
+that throttled subrequests are sent again.
+
+Usage:
+python -m unittest test_rollback_composite
+"""
+
+import importlib
+import json
+import sys
+import threading
+import unittest
+from unittest import mock
+
+# Fall back to the template when no config.py has been set up
+try:
+    import config  # noqa: F401
+except ImportError:
+    sys.modules['config'] = importlib.import_module('config_template')
+
+import rollback_migration
+from rollback_migration import COMPOSITE_COLLECTIONS_LIMIT, MigrationRollback, RateLimiter
+
+
+class CompositeBatchingTest(unittest.TestCase):
+    """Rollback updates are sent within the Composite API subrequest limits."""
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        # referenceIds to answer with a throttled subresponse, once each
+        self.throttle_once = set()
+
+        self.rollback = MigrationRollback.__new__(MigrationRollback)
+        self.rollback.dry_run = False
+        self.rollback.logger = mock.Mock()
+        self.rollback.max_workers = 2
+        self.rollback.rate_limiter = RateLimiter(1000)
+        self.rollback.stats = {
+            'total_records': 0,
+            'successful_rollbacks': 0,
+            'failed_rollbacks': 0,
+            'skipped_records': 0
+        }
+        self.rollback.sf = mock.Mock(sf_version='59.0')
+        self.rollback.sf.restful.side_effect = self._restful
+
+    def _restful(self, path, method='GET', json=None, data=None):
+        body = json if json is not None else _json_loads(data)
+        with self.lock:
+            self.calls.append(body)
+        return {'compositeResponse': [self._subresponse(sub) for sub in body['compositeRequest']]}
+
+    def _subresponse(self, sub):
+        with self.lock:
+            if sub['referenceId'] in self.throttle_once:
+                self.throttle_once.discard(sub['referenceId'])
+                return {
+                    'referenceId': sub['referenceId'],
+                    'httpStatusCode': 403,
+                    'body': [{'errorCode': 'REQUEST_LIMIT_EXCEEDED', 'message': 'TotalRequests Limit exceeded.'}]
+                }
+        return {
+            'referenceId': sub['referenceId'],
+            'httpStatusCode': 200,
+            'body': [{'success': True} for _ in sub['body']['records']]
+        }
+
+    def _batches(self, record_count):
+        updates = [
+            {'attributes': {'type': 'DocListEntry__c'}, 'Id': f"a0X{i:015d}", 'Document__c': 'https://example.com/f'}
+            for i in range(record_count)
+        ]
+        return [updates[i:i + 200] for i in range(0, record_count, 200)]
+
+    def test_subrequests_per_call_within_collections_limit(self):
+        self.rollback._execute_updates(self._batches(1001))
+
+        self.assertEqual(COMPOSITE_COLLECTIONS_LIMIT, 5)
+        self.assertEqual(len(self.calls), 2)
+        for body in self.calls:
+            self.assertLessEqual(len(body['compositeRequest']), COMPOSITE_COLLECTIONS_LIMIT)
+            for sub in body['compositeRequest']:
+                self.assertLessEqual(len(sub['body']['records']), 200)
+
+        self.assertEqual(sum(len(sub['body']['records']) for body in self.calls for sub in body['compositeRequest']), 1001)
+        self.assertEqual(self.rollback.stats['successful_rollbacks'], 1001)
+        self.assertEqual(self.rollback.stats['failed_rollbacks'], 0)
+
+    def test_throttled_subrequests_are_retried(self):
+        self.throttle_once = {'b1', 'b3'}
+
+        with mock.patch.object(rollback_migration.time, 'sleep') as sleep:
+            self.rollback._execute_updates(self._batches(1000))
+
+        sleep.assert_called_once_with(1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual([sub['referenceId'] for sub in self.calls[1]['compositeRequest']], ['b1', 'b3'])
+        self.assertEqual(self.rollback.stats['successful_rollbacks'], 1000)
+        self.assertEqual(self.rollback.stats['failed_rollbacks'], 0)
+
+
+class RateLimiterTest(unittest.TestCase):
+    """The API rate limiter's configuration edge cases."""
+
+    def test_non_positive_rate_is_unlimited(self):
+        for rate in (0, -1):
+            limiter = RateLimiter(rate)
+            with mock.patch('salesforce_client.time.sleep') as sleep:
+                for _ in range(5):
+                    limiter.acquire()
+            sleep.assert_not_called()
+
+
+def _json_loads(data):
+    """Decode a request body sent pre-serialised (orjson) rather than via ``json=``."""
+    if rollback_migration.orjson is not None:
+        return rollback_migration.orjson.loads(data)
+    return json.loads(data)
+
+
+if __name__ == '__main__':
+    unittest.main()